@@ -14,12 +14,22 @@ that can be proggrammed into performance.
 """
 from __future__ import absolute_import, division, print_function
 
+import atexit
 import fnmatch
+import json
 import os
+import re
+import threading
 import wave
 from contextlib import closing
-from itertools import chain
+from itertools import chain, count
 from os.path import abspath, join, isabs, isfile, isdir, splitext
+from traceback import format_exc as error_stack
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
 from .Code import WarningMsg
 from .Logging import Timing
@@ -126,10 +136,13 @@ class _symbolToDir:
 symbolToDir = _symbolToDir(FOXDOT_SND) # singleton
 
 class Buffer(object):
-    def __init__(self, fn, number, channels=1):
+    def __init__(self, fn, number, channels=1, frames=None, rate=None):
         self.fn = fn
         self.bufnum   = int(number)
         self.channels = channels
+        self.frames   = frames
+        self.rate     = rate
+        self.last_used = 0
 
     def __repr__(self):
         return "<Buffer num {}>".format(self.bufnum)
@@ -138,13 +151,67 @@ class Buffer(object):
         return self.bufnum
 
     @classmethod
-    def fromFile(cls, filename, number):
+    def fromFile(cls, filename, number, info=None):
+        """ Create a buffer for an audio file, reading its header unless the
+            (channels, frames, rate) are given in `info` """
+        if info is None:
+            info = readSoundInfo(filename)
+        return cls(filename, number, *info)
+
+
+def readSoundInfo(filename):
+    """ Return the number of channels, frames, and sample rate of an audio
+        file. Frames and rate are None if the file can't be read """
+    try:
+        with closing(wave.open(filename)) as snd:
+            return snd.getnchannels(), snd.getnframes(), snd.getframerate()
+    except wave.Error:
+        return 1, None, None
+
+
+class SoundInfoCache(object):
+    """ Channels, frames, and sample rate of audio files, stored by path and
+        only read again if the file's size or modification time changes. If a
+        filename is given the cache is saved there for the next session """
+    def __init__(self, filename=None):
+        self._filename = filename
+        self._info = {}
+        self._changed = False
+        if filename is not None and isfile(filename):
+            self.load(filename)
+
+    def __len__(self):
+        return len(self._info)
+
+    def get(self, path):
+        """ Return (channels, frames, rate) for an audio file """
+        stat = os.stat(path)
+        entry = self._info.get(path)
+        if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime:
+            entry = [stat.st_size, stat.st_mtime] + list(readSoundInfo(path))
+            self._info[path] = entry
+            self._changed = True
+        return tuple(entry[2:])
+
+    def save(self, filename=None):
+        """ Write the cache to a file if it has changed """
+        filename = filename or self._filename
+        if filename is None or not self._changed:
+            return
+        with open(filename, "w") as f:
+            json.dump({"version": 1, "info": self._info}, f)
+        self._changed = False
+
+    def load(self, filename):
+        """ Read a cache saved with save() """
         try:
-            with closing(wave.open(filename)) as snd:
-                numChannels = snd.getnchannels()
-        except wave.Error:
-            numChannels = 1
-        return cls(filename, number, numChannels)
+            with open(filename) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            WarningMsg("Could not read sample info {!r}: {}".format(filename, e))
+            return
+        if data.get("version") == 1:
+            self._info.update(data["info"])
 
 
 nil = Buffer('', 0)
@@ -160,6 +227,21 @@ class BufferManager(object):
         self._fn_to_buf = {}
         self._paths = [FOXDOT_LOOP] + list(paths)
         self._ext = ['wav', 'wave', 'aif', 'aiff', 'flac']
+        # Memo of (symbol, index) -> Buffer and dirname -> sorted audio files
+        # so that repeated lookups don't touch the disk. Cleared by rescan()
+        self._symbol_to_buf = {}
+        self._symbol_root = symbolToDir.root
+        self._dir_index = {}
+        # Tree of the audio files under the search paths for pattern searches
+        self._path_index = PathIndex(self._ext)
+        self._sound_info = SoundInfoCache()
+        # Buffers can be loaded from the preload thread as well as the clock
+        self._lock = threading.RLock()
+        self._loader = BufferLoader(self)
+        # Optionally free the least recently used buffers when full
+        self._evict = False
+        self._uses = count(1)
+        self._in_use = lambda: ()
 
         self.loops = [fn.rsplit(".",1)[0] for fn in os.listdir(FOXDOT_LOOP)]
 
@@ -177,6 +259,7 @@ class BufferManager(object):
 
     def _reset_buffers(self):
         """ Clears the cache of loaded buffers """
+        self.rescan()
         files = list(self._fn_to_buf.keys())
         self._fn_to_buf = {}
         for fn in files:
@@ -186,6 +269,14 @@ class BufferManager(object):
     def reset(self):
         return self._reset_buffers()
 
+    def rescan(self):
+        """ Forget the stored symbol lookups and directory listings so that
+            sample files are searched for again """
+        self._symbol_to_buf = {}
+        self._symbol_root = symbolToDir.root
+        self._dir_index = {}
+        self._path_index.refresh()
+
     def _incr_nextbuf(self):
         self._nextbuf += 1
         if self._nextbuf >= self._max_buffers:
@@ -197,14 +288,57 @@ class BufferManager(object):
         while self._buffers[self._nextbuf] is not None:
             self._incr_nextbuf()
             if self._nextbuf == start:
+                if self._evict:
+                    return self._evictBuffer()
                 raise RuntimeError("Buffers full! Cannot allocate additional buffers.")
         freebuf = self._nextbuf
         self._incr_nextbuf()
         return freebuf
 
+    def setIndexFile(self, filename):
+        """ Store the index of sample files used for pattern searches in
+            `filename` so that it doesn't need to be rebuilt each session. Only
+            directories that have been modified since it was saved are read """
+        self._path_index = PathIndex(self._ext, filename)
+
+    def setSoundInfoFile(self, filename):
+        """ Store the channels, frames, and sample rate of each sample file in
+            `filename` so that they aren't read from the audio files each
+            session. The file is saved after preloading and on exit """
+        self._sound_info = SoundInfoCache(filename)
+        atexit.register(self._sound_info.save)
+
+    def setEviction(self, on=True):
+        """ When on, the least recently used buffer that isn't being used by a
+            playing player is freed when all the buffers are allocated """
+        self._evict = bool(on)
+
+    def setInUse(self, func):
+        """ Set the function that returns the buffer numbers currently being
+            used, which are never freed to make space for new buffers """
+        self._in_use = func
+
+    def _evictBuffer(self):
+        """ Free the least recently used buffer and return its number """
+        in_use = set(int(bufnum) for bufnum in self._in_use())
+        candidates = [buf for buf in self._buffers if buf is not None and buf.bufnum not in in_use]
+        if not candidates:
+            raise RuntimeError("Buffers full! All buffers are in use.")
+        buf = min(candidates, key=lambda buf: buf.last_used)
+        self.free(buf.bufnum)
+        return buf.bufnum
+
+    def getLoadedBuffer(self, symbol, index=0):
+        """ Return the buffer already loaded for a symbol, or None """
+        try:
+            return self._symbol_to_buf.get((symbol, index))
+        except TypeError:
+            return None
+
     def addPath(self, path):
         """ Add a path to the search paths for samples """
         self._paths.append(abspath(path))
+        self.rescan()
 
     def free(self, filenameOrBuf):
         """ Free a buffer. Accepts a filename or buffer number """
@@ -215,6 +349,7 @@ class BufferManager(object):
         del self._fn_to_buf[buf.fn]
         self._buffers[buf.bufnum] = None
         self._server.bufferFree(buf.bufnum)
+        self._symbol_to_buf = dict((key, value) for key, value in self._symbol_to_buf.items() if value is not buf)
 
     def freeAll(self):
         """ Free all buffers """
@@ -238,6 +373,41 @@ class BufferManager(object):
 
     def getBufferFromSymbol(self, symbol, index=0):
         """ Get buffer information from a symbol """
+        if self._symbol_root != symbolToDir.root:
+            # The sample directory has changed
+            self.rescan()
+        key = (symbol, index)
+        try:
+            buf = self._symbol_to_buf[key]
+            buf.last_used = next(self._uses)
+            return buf
+        except KeyError:
+            pass
+        except TypeError:
+            # Index can't be hashed so don't store the result
+            return self._getBufferFromSymbol(symbol, index)
+        with self._lock:
+            buf = self._getBufferFromSymbol(symbol, index)
+            self._symbol_to_buf[key] = buf
+        return buf
+
+    def preload(self, symbols, indices=(0,)):
+        """ Load the buffers for each symbol in `symbols` (e.g. "x-o*") and
+            each sample index in `indices` on a background thread, so that they
+            are ready before they are first played """
+        for symbol in set(chain.from_iterable(symbols)):
+            if symbol.isspace() or symbolToDir(symbol) is None:
+                continue
+            for index in indices:
+                self._loader.request(symbol, index)
+        return
+
+    def waitForPreload(self):
+        """ Block until all requested samples have been preloaded """
+        self._loader.jobs.join()
+
+    def _getBufferFromSymbol(self, symbol, index=0):
+        """ Search for the sample file for a symbol and load it """
         if symbol.isspace():
             return nil
         dirname = symbolToDir(symbol)
@@ -254,9 +424,13 @@ class BufferManager(object):
 
     def _allocateAndLoad(self, filename, force=False):
         """ Allocates and loads a buffer from a filename, with caching """
+        with self._lock:
+            return self._allocateAndLoadLocked(filename, force)
+
+    def _allocateAndLoadLocked(self, filename, force=False):
         if filename not in self._fn_to_buf:
             bufnum = self._getNextBufnum()
-            buf = Buffer.fromFile(filename, bufnum)
+            buf = Buffer.fromFile(filename, bufnum, self._sound_info.get(filename))
             self._server.bufferRead(filename, bufnum)
             self._fn_to_buf[filename] = buf
             self._buffers[bufnum] = buf
@@ -265,7 +439,9 @@ class BufferManager(object):
             self._server.bufferRead(filename, buf.bufnum)
             # self._fn_to_buf[filename] = bufnum
             # self._buffers[bufnum] = buf
-        return self._fn_to_buf[filename]
+        buf = self._fn_to_buf[filename]
+        buf.last_used = next(self._uses)
+        return buf
 
     def reload(self, filename):
         # symbol = self.getBufferFrom
@@ -309,16 +485,24 @@ class BufferManager(object):
                     return foundfile
         return None
 
-    def _getFileInDir(self, dirname, index):
-        """ Return nth sample in a directory """
+    def _listDir(self, dirname):
+        """ Return a sorted list of the audio files in a directory. The list
+            is stored until the next rescan() """
+        try:
+            return self._dir_index[dirname]
+        except KeyError:
+            pass
         candidates = []
         for filename in sorted(os.listdir(dirname)):
             name, ext = splitext(filename)
             if ext.lower()[1:] in self._ext:
-                fullpath = join(dirname, filename)
-                if len(candidates) == index:
-                    return fullpath
-                candidates.append(fullpath)
+                candidates.append(join(dirname, filename))
+        self._dir_index[dirname] = candidates
+        return candidates
+
+    def _getFileInDir(self, dirname, index):
+        """ Return nth sample in a directory """
+        candidates = self._listDir(dirname)
         if candidates:
             return candidates[int(index) % len(candidates)]
         return None
@@ -336,43 +520,28 @@ class BufferManager(object):
 
         """
 
-        def _findNextSubpaths(path, pattern):
-            """ For a path pattern, find all subpaths that match """
-            # ** is a special case meaning "all recursive directories"
-            if pattern == '**':
-                for dirpath, _, _ in os.walk(path):
-                    yield dirpath
-            else:
-                children = os.listdir(path)
-                for c in fnmatch.filter(children, pattern):
-                    yield join(path, c)
-
         candidates = []
-        queue = self._paths[:]
+        queue = [node for node in map(self._path_index.get, self._paths) if node is not None]
         subpaths = filename.split(os.sep)
         filepat = subpaths.pop()
         while subpaths:
             subpath = subpaths.pop(0)
             queue = list(chain.from_iterable(
-                (_findNextSubpaths(p, subpath) for p in queue)
+                (node.match(subpath) for node in queue)
             ))
 
         # If the filepat (ex. 'foo*.wav') has an extension, we want to match
         # the full filename. If not, we just match against the basename.
         match_base = not hasext(filepat)
 
-        for path in queue:
-            for subpath, _, filenames in os.walk(path):
-                for filename in sorted(filenames):
-                    basename, ext = splitext(filename)
-                    if ext[1:].lower() not in self._ext:
-                        continue
-                    if match_base:
-                        ismatch = fnmatch.fnmatch(basename, filepat)
-                    else:
-                        ismatch = fnmatch.fnmatch(filename, filepat)
-                    if ismatch:
-                        fullpath = join(subpath, filename)
+        ismatch = re.compile(fnmatch.translate(os.path.normcase(filepat))).match
+
+        for node in queue:
+            for subnode in node.walk():
+                for filename in subnode.files:
+                    name = splitext(filename)[0] if match_base else filename
+                    if ismatch(os.path.normcase(name)):
+                        fullpath = join(subnode.path, filename)
                         if len(candidates) == index:
                             return fullpath
                         candidates.append(fullpath)
@@ -424,6 +593,170 @@ class BufferManager(object):
             return buf.bufnum
 
 
+class PathNode(object):
+    """ A directory in a `PathIndex` with its sub-directories, in the order
+        they are listed, and its audio files, sorted by name """
+    def __init__(self, path, is_link=False):
+        self.path = path
+        self.is_link = is_link
+        self.mtime = None
+        self.dirs = []
+        self.files = []
+
+    def match(self, pattern):
+        """ Return the sub-directories matching a path pattern element, where
+            '**' matches this directory and all of its sub-directories """
+        if pattern == '**':
+            return list(self.walk())
+        dirs = dict(self.dirs)
+        return [dirs[name] for name in fnmatch.filter([name for name, _ in self.dirs], pattern)]
+
+    def walk(self):
+        """ Yield this directory and its sub-directories in the same order as
+            os.walk, which doesn't follow symbolic links below the top """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed([child for _, child in node.dirs if not child.is_link]))
+
+    def toDict(self):
+        return {"mtime": self.mtime, "files": self.files, "link": self.is_link,
+                "dirs": [[name, child.toDict()] for name, child in self.dirs]}
+
+    @classmethod
+    def fromDict(cls, path, data):
+        node = cls(path, data["link"])
+        node.mtime = data["mtime"]
+        node.files = data["files"]
+        node.dirs = [(name, cls.fromDict(join(path, name), child)) for name, child in data["dirs"]]
+        return node
+
+
+class PathIndex(object):
+    """ In-memory tree of the audio files under each search path, used to find
+        samples with wildcard patterns without walking the file system. If a
+        filename is given, the tree is saved there and re-used in the next
+        session, re-reading only directories whose modification time changed """
+    def __init__(self, extensions, filename=None):
+        self._ext = extensions
+        self._filename = filename
+        self._roots = {}
+        self._changed = False
+        if filename is not None and isfile(filename):
+            self.load(filename)
+
+    def get(self, path):
+        """ Return the tree for a search path, reading it if necessary """
+        try:
+            return self._roots[path]
+        except KeyError:
+            pass
+        if not isdir(path):
+            return None
+        node = self._roots[path] = PathNode(path)
+        self._update(node, set())
+        self.save()
+        return node
+
+    def refresh(self):
+        """ Re-read any directories that have changed """
+        for path, node in list(self._roots.items()):
+            if isdir(path):
+                self._update(node, set())
+            else:
+                del self._roots[path]
+                self._changed = True
+        self.save()
+
+    def _update(self, node, visited):
+        """ Re-read a directory if modified and check its sub-directories """
+        realpath = os.path.realpath(node.path)
+        if realpath in visited:
+            # Symbolic link to a directory we've already indexed
+            node.dirs, node.files = [], []
+            return
+        visited.add(realpath)
+        try:
+            mtime = os.stat(node.path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime != node.mtime or mtime is None:
+            self._changed = True
+            node.mtime = mtime
+            children = dict(node.dirs)
+            node.dirs, node.files = [], []
+            try:
+                names = os.listdir(node.path)
+            except OSError:
+                names = []
+            for name in names:
+                fullpath = join(node.path, name)
+                if isdir(fullpath):
+                    child = children.get(name)
+                    if child is None:
+                        child = PathNode(fullpath, os.path.islink(fullpath))
+                    node.dirs.append((name, child))
+                elif splitext(name)[1][1:].lower() in self._ext:
+                    node.files.append(name)
+            node.files.sort()
+        for _, child in node.dirs:
+            self._update(child, visited)
+
+    def save(self, filename=None):
+        """ Write the index to a file if it has changed """
+        filename = filename or self._filename
+        if filename is None or not self._changed:
+            return
+        data = {"version": 1, "ext": self._ext,
+                "roots": dict((path, node.toDict()) for path, node in self._roots.items())}
+        with open(filename, "w") as f:
+            json.dump(data, f)
+        self._changed = False
+
+    def load(self, filename):
+        """ Read an index saved with save() and update any changed directories """
+        try:
+            with open(filename) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            WarningMsg("Could not read sample index {!r}: {}".format(filename, e))
+            return
+        if data.get("version") != 1 or data.get("ext") != self._ext:
+            return
+        self._roots = dict((path, PathNode.fromDict(path, node)) for path, node in data["roots"].items())
+        self.refresh()
+
+
+class BufferLoader(object):
+    """ Background thread that loads buffers requested by `BufferManager.preload` """
+    def __init__(self, manager):
+        self.manager = manager
+        self.jobs = queue.Queue()
+        self.thread = None
+
+    def request(self, symbol, index):
+        """ Asks for the buffer for `symbol` and `index` to be loaded """
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run)
+            self.thread.daemon = True
+            self.thread.start()
+        self.jobs.put((symbol, index))
+        return
+
+    def run(self):
+        while True:
+            symbol, index = self.jobs.get()
+            try:
+                self.manager.getBufferFromSymbol(symbol, index)
+                if self.jobs.empty():
+                    self.manager._sound_info.save()
+            except Exception:
+                print(error_stack())
+            finally:
+                self.jobs.task_done()
+
+
 def hasext(filename):
     return bool(splitext(filename)[1])
 
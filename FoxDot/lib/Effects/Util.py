@@ -191,6 +191,36 @@ class Out(Effect):
         s += " }).add;\n"
         return s
 
+class SharedOut(Effect):
+    """ Mixes a note into the bus of its Player's shared effect group (see `Player.share_effects`) """
+    def __init__(self):
+        self.max_duration = 8
+        Effect.__init__(self, 'makeSharedSound', 'makeSharedSound')
+        self.save()
+    def __str__(self):
+        s  = "SynthDef.new(\\makeSharedSound,\n"
+        s += "{ arg bus, out, sus; var osc;\n"
+        s += "	osc = In.ar(bus, 2);\n"
+        s += "  osc = EnvGen.ar(Env([1,1,0],[sus * {}, 0.1]), doneAction: 14) * osc;\n".format(self.max_duration)
+        s += "	DetectSilence.ar(osc, amp:0.0001, time: 0.1, doneAction: 14);\n"
+        s += "OffsetOut.ar(out, osc);\n"
+        s += " }).add;\n"
+        return s
+
+class SharedMix(Effect):
+    """ Plays the output of a Player's shared effect group """
+    def __init__(self):
+        Effect.__init__(self, 'playSharedSound', 'playSharedSound')
+        self.save()
+    def __str__(self):
+        s  = "SynthDef.new(\\playSharedSound,\n"
+        s += "{ arg bus; var osc;\n"
+        s += "	osc = In.ar(bus, 2);\n"
+        s += "Out.ar(0, osc[0]);\n"
+        s += "Out.ar(1, osc[1]);\n"
+        s += " }).add;\n"
+        return s
+
 class EffectManager(dict):
     def __init__(self):
 
@@ -245,6 +275,11 @@ class EffectManager(dict):
         """ Returns *all* keywords for all effects """
         return tuple(self.all_kw)
 
+    def shared(self):
+        """ Returns the post-envelope effects that don't depend on the length of a
+            note, so can be shared by all of a Player's notes """
+        return [name for name in self.order[2] if "sus" not in self[name].args]
+
     def __iter__(self):
         for key in self.kw:
             yield key, self[key]
@@ -253,7 +288,7 @@ class EffectManager(dict):
         """ Re-sends each effect to SC """
         for kw, effect in self:
             effect.load()
-        In(); Out();
+        In(); Out(); SharedOut(); SharedMix();
         return
 
 
@@ -397,5 +432,5 @@ fx = FxList.new("drive", "overdriveDistortion", {"drive":0}, order=2)
 fx.add("osc = (osc * (drive * 50)).clip(0,0.2).fold2(2)")
 fx.save()
 
-In(); Out()
+In(); Out(); SharedOut(); SharedMix()
 Effect.server.setFx(FxList)
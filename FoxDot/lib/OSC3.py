@@ -291,6 +291,12 @@ class OSCMessage(object):
             raise TypeError("Can only append 'OSCMessage' to 'OSCBundle'")
         
         if isinstance(argument, (tuple, list)):
+                        if typehint is None:
+                                tags, binary = _encodeArguments(argument)
+                                self.typetags += tags
+                                self.message += binary
+                                return
+
                         for arg in argument:
                                 self.append(arg, typehint)
                         
@@ -799,6 +805,147 @@ def OSCTimeTag(time):
 
     return binary
 
+######
+#
+# Fast OSC encoding functions
+#
+######
+
+# Padded OSC-strings, struct formats and typetags of shapes of arguments seen so far
+_encodedStrings = {}
+_encodedStructs = {}
+_encodedTypetags = {}
+_maxEncoderCacheSize = 4096
+
+def _cachedString(next):
+    """Returns the OSC-string for the given str, caching the result
+    """
+    binary = _encodedStrings.get(next, None)
+    if binary is None:
+        if len(_encodedStrings) >= _maxEncoderCacheSize:
+            _encodedStrings.clear()
+        binary = _encodedStrings[next] = OSCString(next)
+    return binary
+
+def _cachedStruct(format):
+    """Returns the compiled struct.Struct for the given format, caching the result
+    """
+    packer = _encodedStructs.get(format, None)
+    if packer is None:
+        if len(_encodedStructs) >= _maxEncoderCacheSize:
+            _encodedStructs.clear()
+        packer = _encodedStructs[format] = struct.Struct(format)
+    return packer
+
+def _prepareArguments(args, tags, format, values):
+    """Adds the typetag, struct format and value(s) of each argument to the given lists.
+    Ints, floats, strings and blobs (bytes) are encoded directly, lists and dicts are
+    flattened as by OSCMessage.append(), and other arguments are encoded by OSCArgument
+    """
+    for arg in args:
+        kind = type(arg)
+        if kind is float:
+            tags.append("f")
+            format.append("f")
+            values.append(arg)
+        elif kind is int:
+            tags.append("i")
+            format.append("i")
+            values.append(arg)
+        elif kind is str:
+            binary = _cachedString(arg)
+            tags.append("s")
+            format.append("%ds" % len(binary))
+            values.append(binary)
+        elif kind in (bytes, bytearray):
+            tags.append("b")
+            format.append("i%ds" % (int(math.ceil(len(arg) / 4.0)) * 4))
+            values.append(len(arg))
+            values.append(bytes(arg))
+        elif kind in (list, tuple):
+            _prepareArguments(arg, tags, format, values)
+        elif kind is dict:
+            _prepareArguments(list(arg.items()), tags, format, values)
+        elif isinstance(arg, OSCMessage):
+            raise TypeError("Can only append 'OSCMessage' to 'OSCBundle'")
+        else:
+            tag, binary = OSCArgument(arg)
+            tags.append(tag)
+            format.append("%ds" % len(binary))
+            values.append(binary)
+
+def _encodeArguments(args):
+    """Returns the (typetags, binary) of a list of arguments, packed in one call
+    """
+    tags = []
+    format = []
+    values = []
+    _prepareArguments(args, tags, format, values)
+    return "".join(tags), _cachedStruct(">" + "".join(format)).pack(*values)
+
+def _prepareMessage(address, args):
+    """Returns a (struct.Struct, values) tuple that packs an OSC-message in one call,
+    building the typetag-string and the struct format in one pass over the arguments
+    """
+    address = _cachedString(address)
+    tags = []
+    format = []
+    values = [address, None]
+    _prepareArguments(args, tags, format, values)
+    tags = "".join(tags)
+    typetags = _encodedTypetags.get(tags, None)
+    if typetags is None:
+        if len(_encodedTypetags) >= _maxEncoderCacheSize:
+            _encodedTypetags.clear()
+        typetags = _encodedTypetags[tags] = OSCString("," + tags)
+    values[1] = typetags
+    packer = _cachedStruct(">%ds%ds%s" % (len(address), len(typetags), "".join(format)))
+    return packer, values
+
+def encodeOSC(address, args=()):
+    """Returns the binary representation of an OSC-message with the given address
+    and list of arguments. Produces the same binary as OSCMessage.getBinary()
+    for ints, floats and strings, and also supports blobs (bytes)
+    """
+    packer, values = _prepareMessage(address, args)
+    return packer.pack(*values)
+
+def encodeOSCBundle(time, elements):
+    """Returns the binary representation of an OSC-bundle with the given timetag.
+    Each element may be an (address, arguments) tuple, an OSCMessage or OSCBundle,
+    already encoded bytes, or a (timetag, elements) tuple for a nested bundle.
+    Elements are packed into a preallocated bytearray
+    """
+    parts = []
+    size = 16
+    for element in elements:
+        if isinstance(element, OSCMessage):
+            part = element.getBinary()
+            length = len(part)
+        elif type(element) in (bytes, bytearray):
+            part = element
+            length = len(part)
+        elif type(element[0]) is str:
+            part = _prepareMessage(element[0], element[1])
+            length = part[0].size
+        else:
+            part = encodeOSCBundle(element[0], element[1])
+            length = len(part)
+        parts.append((part, length))
+        size += 4 + length
+    binary = bytearray(size)
+    binary[0:16] = b"#bundle\x00" + OSCTimeTag(time)
+    offset = 16
+    for part, length in parts:
+        struct.pack_into(">i", binary, offset, length)
+        offset += 4
+        if type(part) is tuple:
+            part[0].pack_into(binary, offset, *part[1])
+        else:
+            binary[offset:offset + length] = part
+        offset += length
+    return bytes(binary)
+
 ######
 #
 # OSCMessage decoding functions
@@ -924,6 +1071,112 @@ def decodeOSC(data):
             raise OSCError("OSCMessage's typetag-string lacks the magic ','")
     return decoded
 
+_unpackInt = struct.Struct(">i").unpack_from
+_unpackFloat = struct.Struct(">f").unpack_from
+_unpackDouble = struct.Struct(">d").unpack_from
+_unpackTimeTag = struct.Struct(">LL").unpack_from
+
+def _readStringAt(data, offset, end):
+    """Reads the (null-terminated) string starting at 'offset', returning
+    the string and the offset of the next value
+    """
+    length = data.index(b"\x00", offset, end) - offset
+    return (data[offset:offset + length].decode(), offset + int(math.ceil((length + 1) / 4.0) * 4))
+
+def _readBlobAt(data, offset, end):
+    """Reads the (numbered) block of data starting at 'offset'
+    """
+    length = _unpackInt(data, offset)[0]
+    return (data[offset + 4:min(offset + 4 + length, end)], offset + int(math.ceil(length / 4.0) * 4) + 4)
+
+def _readIntAt(data, offset, end):
+    """Reads the 32-bit integer starting at 'offset'
+    """
+    if end - offset < 4:
+        print("Error: too few bytes for int", data[offset:end], max(end - offset, 0))
+        return (0, offset)
+    return (_unpackInt(data, offset)[0], offset + 4)
+
+def _readFloatAt(data, offset, end):
+    """Reads the 32-bit float starting at 'offset'
+    """
+    if end - offset < 4:
+        print("Error: too few bytes for float", data[offset:end], max(end - offset, 0))
+        return (0, offset)
+    return (_unpackFloat(data, offset)[0], offset + 4)
+
+def _readDoubleAt(data, offset, end):
+    """Reads the 64-bit float starting at 'offset'
+    """
+    if end - offset < 8:
+        print("Error: too few bytes for double", data[offset:end], max(end - offset, 0))
+        return (0, offset)
+    return (_unpackDouble(data, offset)[0], offset + 8)
+
+def _readTimeTagAt(data, offset, end):
+    """Reads the TimeTag starting at 'offset'
+    """
+    high, low = _unpackTimeTag(data, offset)
+    if (high == 0) and (low <= 1):
+        time = 0.0
+    else:
+        time = int(NTP_epoch + high) + float(low / NTP_units_per_second)
+    return (time, offset + 8)
+
+_readAtTable = {"i":_readIntAt, "f":_readFloatAt, "s":_readStringAt, "b":_readBlobAt, "d":_readDoubleAt, "t":_readTimeTagAt}
+
+def decodeOSCBuffer(data, offset=0, end=None):
+    """Converts a binary OSC message to a Python list, the same as decodeOSC, but
+    reads each value in place using offsets instead of copying the rest of the data
+    after every value. 'data' can be bytes, a bytearray or a memoryview
+    """
+    if type(data) is not bytes:
+        data = bytes(data)
+    if end is None:
+        end = len(data)
+    decoded = []
+    address, offset = _readStringAt(data, offset, end)
+    if address.startswith(","):
+        typetags = address
+        address = ""
+    else:
+        typetags = ""
+
+    if address == "#bundle":
+        time, offset = _readTimeTagAt(data, offset, end)
+        decoded.append(address)
+        decoded.append(time)
+        while offset < end:
+            length, offset = _readIntAt(data, offset, end)
+            decoded.append(decodeOSCBuffer(data, offset, min(offset + length, end)))
+            offset += length
+
+    elif offset < end:
+        if not len(typetags):
+            typetags, offset = _readStringAt(data, offset, end)
+        decoded.append(address)
+        decoded.append(typetags)
+        if typetags.startswith(","):
+            packer = _numericStruct(typetags)
+            if packer is not None and packer.size <= end - offset:
+                # Only ints and floats, so read them all at once
+                decoded.extend(packer.unpack_from(data, offset))
+            else:
+                for tag in typetags[1:]:
+                    value, offset = _readAtTable[tag](data, offset, end)
+                    decoded.append(value)
+        else:
+            raise OSCError("OSCMessage's typetag-string lacks the magic ','")
+    return decoded
+
+def _numericStruct(typetags):
+    """Returns a struct.Struct that reads all of the arguments of a message whose
+    typetag-string only has ints, floats and doubles, or None
+    """
+    if typetags.strip(",ifd"):
+        return None
+    return _cachedStruct(">" + typetags[1:])
+
 ######
 #
 # Utility functions
@@ -3,8 +3,9 @@
     This module contains all the sub-classes of `GeneratorPattern` used in FoxDot. Unlike
     a `Pattern`, a `GeneratorPattern` does not contain a list that is iterated over or
     indexed but returns a value based on the index and an internal function. For example,
-    `PRand` returns a random value from a list of values. It will always return the same
-    value for the same index as it stores this in its internal cache. `Pattern` methods
+    `PRand` returns a random value from a list of values. It will return the same value
+    for the same index as it stores the values of the most recent indices accessed in its
+    internal cache (see `GeneratorPattern.set_cache_size`). `Pattern` methods
     such as `rotate` or `palindrome` are not available from the `GeneratorPattern` class
     but slicing generators will return a `Pattern` object from which these methods can
     be called e.g.
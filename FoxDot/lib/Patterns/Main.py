@@ -85,6 +85,14 @@ class metaPattern(object):
     bracket_style = "[]"
     debugging = False
     meta = []
+    # (data, length, version, is_numeric) stored by is_numeric()
+    numeric_cache = None
+    # (data, length, version, expanded) stored by expand()
+    expanded_cache = None
+    # Laced patterns longer than this aren't expanded
+    EXPAND_LIMIT = 4096
+    # Incremented when a Pattern's method changes its data in place
+    version = 0
 
     def __init__(self, *args):
 
@@ -104,6 +112,10 @@ class metaPattern(object):
             elif isinstance(data, self.__class__):
 
                 self.data = data.data
+
+                self.numeric_cache = data.numeric_cache
+
+                self.expanded_cache = data.expanded_cache
                 
             else:
                 
@@ -119,6 +131,63 @@ class metaPattern(object):
         """ Returns a new pattern object with this Pattern's class type """
         return self.__class__(data + self.meta)
 
+    def new_numeric(self, data):
+        """ Like `new` but for a list of ints and floats, which doesn't need converting """
+        if type(self) is not Pattern:
+            return self.new(data)
+        new = Pattern()
+        new.data = data
+        return new
+
+    def is_numeric(self):
+        """ Returns True if the data only contains ints and floats i.e. there are no nested
+            patterns, groups, or generators. The result is stored until the data is replaced
+            or changed using a Pattern method, so writing to `.data` directly is not supported. """
+        data, cache = self.data, self.numeric_cache
+        if cache is None or cache[0] is not data or cache[1] != len(data) or cache[2] != metaPattern.version:
+            cache = (data, len(data), metaPattern.version, all(type(item) in (int, float) for item in data))
+            self.numeric_cache = cache
+        return cache[3]
+
+    def expand(self):
+        """ Returns a list of the values that `getitem` returns for one cycle of the pattern
+            such that nested patterns are laced e.g. `P[0, [1, 2]]` gives `[0, 1, 0, 2]`.
+            Returns None if the values can change, i.e. there are generators or Pvars, or if
+            the list would be longer than `EXPAND_LIMIT`. Stored in the same way as `is_numeric`,
+            so items written directly to `.data` e.g. `pat.data[0] = 1` are not seen; use
+            `pat[0] = 1` or `pat.set(0, 1)` instead. """
+        data, cache = self.data, self.expanded_cache
+        if cache is None or cache[0] is not data or cache[1] != len(data) or cache[2] != metaPattern.version:
+            cache = (data, len(data), metaPattern.version, self.get_expanded_data())
+            self.expanded_cache = cache
+        return cache[3]
+
+    def get_expanded_data(self):
+        """ Calculates the list returned by `expand` """
+        nested = {}
+        for i, item in enumerate(self.data):
+            if type(item) is Pattern:
+                nested[i] = item.expand()
+                if nested[i] is None:
+                    return None
+            elif isinstance(item, (Pattern, Pattern.Pvar, GeneratorPattern)):
+                return None
+        if len(nested) == 0:
+            return self.data
+        n = len(self.data)
+        size = LCM(*[len(values) for values in nested.values()]) * n
+        if size > self.EXPAND_LIMIT:
+            return None
+        expanded = []
+        for key in range(size):
+            i = key % n
+            if i in nested:
+                values = nested[i]
+                expanded.append(values[(key // n) % len(values)])
+            else:
+                expanded.append(self.data[i])
+        return expanded
+
     def transform(self, func):
         """
         Recursively transforms values and nested patterns
@@ -166,6 +235,8 @@ class metaPattern(object):
             8
             ```
         """
+        if self.is_numeric():
+            return len(self.data)
         lengths = [1]
         n = 0
         for item in self.data:
@@ -251,6 +322,11 @@ class metaPattern(object):
         elif isinstance(key, slice):
             val = self.getslice(key.start,  key.stop, key.step)
         else:
+            # Laced patterns are expanded once then indexed
+            if type(key) is int:
+                expanded = self.expand()
+                if expanded is not None:
+                    return expanded[key % len(expanded)]
             # Get the "nested" single value
             i = key % len(self.data)
             val = self.data[i]
@@ -262,6 +338,7 @@ class metaPattern(object):
         return val
     
     def __setitem__(self, key, value):
+        metaPattern.version += 1
         if isinstance(key, slice):
             self.data[key] = Format(value) # TODO - make sure this works
         else:
@@ -277,6 +354,7 @@ class metaPattern(object):
         return
 
     def setitem(self, key, value):
+        metaPattern.version += 1
         self.data[key] = Format(value)
             
     def __iter__(self):
@@ -303,6 +381,7 @@ class metaPattern(object):
             
     def __setslice__(self, i, j, item):
         """ Only works in Python 2 - maybe get rid? """
+        metaPattern.version += 1
         self.data[i:j] = Format(item)
 
     # Integer returning
@@ -535,6 +614,8 @@ class metaPattern(object):
             not reversed. To reverse the contents of nester patterns
             use `Pattern.mirror()`
         """
+        if self.is_numeric():
+            return self.new_numeric(self.data[::-1])
         new = self.new(self.data[:])
         new.data.reverse()
         return new
@@ -546,6 +627,8 @@ class metaPattern(object):
     def mirror(self):
         """ Reverses the pattern. Differs to `Pattern.reverse()` in that
             all nested patters are also reversed. """
+        if self.is_numeric():
+            return self.new_numeric(self.data[::-1])
         new = []
         for i in range(len(self.data), 0, -1):
 
@@ -658,6 +741,9 @@ class metaPattern(object):
     @loop_pattern_method
     def stretch(self, size):
         """ Stretches (repeats) the contents until len(Pattern) == size """
+        if size > 0 and len(self.data) > 0 and self.is_numeric():
+            n, remainder = divmod(int(size), len(self.data))
+            return self.new_numeric(self.data * n + self.data[:remainder])
         new = []
         for n in range(size):
             new.append( modi(self.data, n) )
@@ -723,6 +809,8 @@ class metaPattern(object):
     def rotate(self, n=1):
         n = int(n)
         new = self.data[n:] + self.data[0:n]
+        if self.is_numeric():
+            return self.new_numeric(new)
         return self.new(new)
 
     @loop_pattern_method
@@ -861,31 +949,38 @@ class metaPattern(object):
     
     def extend(self, seq):
         """ Should return None """
+        metaPattern.version += 1
         self.data.extend(map(convert_nested_data, seq))
         return
 
     def append(self, item):
         """ Converts a new item to PGroup etc and appends """
+        metaPattern.version += 1
         self.data.append(convert_nested_data(item))
         return
     
     def i_rotate(self, n=1):
+        metaPattern.version += 1
         self.data = self.data[n:] + self.data[0:n]
         return self
 
     def i_reverse(self):
+        metaPattern.version += 1
         self.data.reverse()
         return self
 
     def i_sort(self):
+        metaPattern.version += 1
         self.data = Pattern(sorted(self.data))
         return self
 
     def i_shuf(self):
+        metaPattern.version += 1
         shuffle(self.data)
         return self
 
     def set(self, index, value):
+        metaPattern.version += 1
         self.data[index] = asStream(value)
         return self
 
@@ -1306,12 +1401,64 @@ class PGroup(metaPattern):
 
 import random
 
+class GeneratorCache(object):
+    """ Stores the values of the last `size` indices accessed in a `GeneratorPattern`.
+        Each index has a slot in a ring buffer, so a value is kept until an index
+        `size` steps away is accessed. Can be used like a dict of index to value. """
+    missing = object()
+
+    def __init__(self, size=256):
+        self.size = max(int(size), 1)
+        self.clear()
+
+    def clear(self):
+        self.keys = [None] * self.size
+        self.values = [None] * self.size
+        self.count = 0
+
+    def resize(self, size):
+        """ Changes the number of values stored, keeping the most recent """
+        items = sorted(self.items())
+        self.size = max(int(size), 1)
+        self.clear()
+        for index, value in items:
+            self[index] = value
+
+    def items(self):
+        return [(index, self.values[i]) for i, index in enumerate(self.keys) if index is not None]
+
+    def get(self, index, default=None):
+        slot = hash(index) % self.size
+        if self.keys[slot] == index:
+            return self.values[slot]
+        return default
+
+    def __contains__(self, index):
+        return self.keys[hash(index) % self.size] == index
+
+    def __getitem__(self, index):
+        slot = hash(index) % self.size
+        if self.keys[slot] == index:
+            return self.values[slot]
+        raise KeyError(index)
+
+    def __setitem__(self, index, value):
+        slot = hash(index) % self.size
+        if self.keys[slot] is None:
+            self.count += 1
+        self.keys[slot] = index
+        self.values[slot] = value
+
+    def __len__(self):
+        return self.count
+
 class GeneratorPattern:
     """
         Used for when a Pattern does not generate a set length pattern,
         e.g. random patterns
     """
     MAX_SIZE = 65536
+    CACHE_SIZE = 256 # Values remembered, i.e. 16 bars of 1/16 notes
     debugging = False
 
     def __init__(self, **kwargs):
@@ -1328,7 +1475,7 @@ class GeneratorPattern:
         self.last_value = None
         self.data  = []
         self.index   = 0
-        self.cache = {}
+        self.cache = GeneratorCache(self.CACHE_SIZE)
 
     def __repr__(self):
         """ String version is the name of the class and its arguments """
@@ -1340,12 +1487,13 @@ class GeneratorPattern:
         
     def getitem(self, index=None, *args):
         """ Calls self.func(index) to get an item if index is not in
-            self.history, otherwise returns self.history[index] """
+            self.cache, otherwise returns self.cache[index] """
         if index is None:
             index, self.index = self.index, self.index + 1
         # If we have already accessed by this index, return the value
-        if index in self.cache:
-            return self.cache[index]
+        value = self.cache.get(index, GeneratorCache.missing)
+        if value is not GeneratorCache.missing:
+            return value
         else:
             # Calculate new value
             value = self.func(index)
@@ -1358,11 +1506,21 @@ class GeneratorPattern:
         ''' Returns the last value used if it exists '''
         return self.cache.get(self.index - 1)
 
+    def set_cache_size(self, size):
+        """ Sets the number of recently accessed values to remember, so that
+            accessing the same index again returns the same value """
+        if isinstance(self.cache, GeneratorCache):
+            self.cache.resize(size)
+        else:
+            self.cache = GeneratorCache(size)
+        return self
+
     def new(self, other, func=Nil):
         """ Creates a new `GeneratorPattern` that references
             this pattern but returns a modified value based on
             func. """
         new = GeneratorPattern()
+        new.cache = GeneratorCache(getattr(self.cache, "size", self.CACHE_SIZE))
         new.parent = self
         new.name   = new.parent.name
         new.other  = asStream(other) # We want to store the pattern I think?
@@ -1539,13 +1697,17 @@ Format = PatternFormat ## TODO - Remove this
 
 def convert_nested_data(data):
     """ Converts a piece of data in a pattern to a PGroup/Pattern as appropriate """
-    from ..Constants import NoneConst
-
     if isinstance(data, (int, float)):
 
         return data
 
-    elif data == None:
+    elif type(data) is str:
+
+        return Pattern(data) if len(data) > 1 else data
+
+    from ..Constants import NoneConst
+
+    if data == None:
 
         return NoneConst()
 
@@ -1553,7 +1715,7 @@ def convert_nested_data(data):
         
         return PGroup(data)
     
-    elif type(data) is list or (type(data) is str and len(data) > 1):
+    elif type(data) is list:
     
         return Pattern(data)
 
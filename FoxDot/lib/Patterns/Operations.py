@@ -2,6 +2,7 @@ from __future__ import absolute_import, division, print_function
 
 from ..Utils import *
 import itertools
+import operator
 
 """
     Module for key operations on Python lists or FoxDot Patterns
@@ -16,6 +17,10 @@ class POperand:
         
         self.operate = func
 
+        # Patterns that only contain ints and floats can use the equivalent built-in operator
+
+        self.fast_operate, self.swapped = NUMERIC_OPERATIONS.get(func, (None, False))
+
     def __call__(self, A, B):
         """ A is always a Pattern or PGroup."""
 
@@ -40,6 +45,14 @@ class POperand:
 
         i, length = 0, LCM(len(A.get_data()), len(B.get_data()))
 
+        if self.fast_operate is not None and A.is_numeric() and B.is_numeric():
+
+            P1 = self.numeric(A.get_data(), B.get_data(), length)
+
+            if P1 is not None:
+
+                return key.true_copy(P1)
+
         gen_a = itertools.cycle(A.get_data())
         gen_b = itertools.cycle(B.get_data())
 
@@ -68,6 +81,30 @@ class POperand:
 
         return key.true_copy(P1)
 
+    def numeric(self, data_a, data_b, length):
+        """ Applies the operation to two lists of ints and floats using `map`. Returns
+            None if a value is divided by zero, so that those values can be set to 0 """
+
+        if len(data_a) != length:
+
+            data_a = itertools.islice(itertools.cycle(data_a), length)
+
+        if len(data_b) != length:
+
+            data_b = itertools.islice(itertools.cycle(data_b), length)
+
+        if self.swapped:
+
+            data_a, data_b = data_b, data_a
+
+        try:
+
+            return list(map(self.fast_operate, data_a, data_b))
+
+        except ZeroDivisionError:
+
+            return None
+
 # General operations
 def Nil(a, b):  return a
 def Add(a, b):  return a + b
@@ -100,6 +137,26 @@ def rFloorDiv(a, b): return b // a
 def rXor(a, b): return b ^ a
 def rOr(a, b):  return b | a
 
+# Operations that can be applied to ints and floats with the operator module,
+# and whether the arguments are swapped
+
+NUMERIC_OPERATIONS = {
+    Add : (operator.add, False),
+    Sub : (operator.sub, False),
+    Mul : (operator.mul, False),
+    Div : (operator.truediv, False),
+    Mod : (operator.mod, False),
+    Pow : (operator.pow, False),
+    FloorDiv : (operator.floordiv, False),
+    rAdd : (operator.add, True),
+    rSub : (operator.sub, True),
+    rMul : (operator.mul, True),
+    rDiv : (operator.truediv, True),
+    rMod : (operator.mod, True),
+    rPow : (operator.pow, True),
+    rFloorDiv : (operator.floordiv, True),
+}
+
 # Pattern operations
 PAdd = POperand(Add)
 
@@ -8,6 +8,7 @@
 from __future__ import absolute_import, division, print_function
 
 import re
+from collections import namedtuple, OrderedDict
 
 from .PlayString import *
 from .Generators import PRand
@@ -24,9 +25,17 @@ square_type = PGroupPlus
 braces_type = PRand
 bar_type    = PGroupOr
 
+open_brackets = {"(": ")", "[": "]", "{": "}", "<": ">"}
+close_brackets = {")": "(", "]": "[", "}": "{", ">": "<"}
+
+# A parsed character or bracketed group of nodes. `kind` is "char" or the opening
+# bracket, and `value` is the character or a tuple of nodes
+
+PlayNode = namedtuple("PlayNode", ["kind", "value"])
+
 def ParsePlayString(string, flat=False):
     """ Returns the parsed play string used by sample player """
-    output, _ = feed(string)
+    output, _ = evaluate_play_nodes(play_string_cache.get(string))
     return output
 
 def convert_to_int(data):
@@ -72,39 +81,85 @@ def arrow_zip(pat1, pat2):
 
     return output
 
-def feed(string):
-    """ Used to recursively parse nested strings, returns a list object (not Pattern),
+def tokenize_play_string(string):
+    """ Finds the closing bracket for each opening bracket, matching brackets of the same
+        type only, and the next '|' character after each '|' in one pass. Returns two
+        dicts of index -> index. """
+    stacks = dict((br, []) for br in open_brackets)
+    matches = {}
+    next_bar = {}
+    last_bar = None
+    for i, char in enumerate(string):
+        if char in stacks:
+            stacks[char].append(i)
+        elif char in close_brackets:
+            stack = stacks[close_brackets[char]]
+            if stack:
+                matches[stack.pop()] = i
+        elif char == "|":
+            if last_bar is not None:
+                next_bar[last_bar] = i
+            last_bar = i
+    return matches, next_bar
+
+def parse_play_string(string, matches=None, next_bar=None, start=0, end=None):
+    """ Returns a tuple of PlayNodes for string[start:end] """
+    if matches is None:
+        matches, next_bar = tokenize_play_string(string)
+    if end is None:
+        end = len(string)
+    nodes = []
+    i = start
+    while i < end:
+        char = string[i]
+        if char in open_brackets or char == "|":
+            j = next_bar.get(i) if char == "|" else matches.get(i)
+            if j is None or j >= end:
+                if char == "|":
+                    err = "No {!r} character found in string {!r}".format(char, string[start:end])
+                else:
+                    err = "Closing bracket {!r} missing in string {!r}".format(open_brackets[char], string[start:end])
+                raise ParseError(err)
+            value = parse_play_string(string, matches, next_bar, i + 1, j)
+            if len(value) == 0:
+                if char == "|":
+                    e = "Empty '||' delimeters in string"
+                else:
+                    e = "Empty '{}{}' brackets in string".format(char, open_brackets[char])
+                raise ParseError(e)
+            nodes.append(PlayNode(char, value))
+            i = j
+        elif char not in close_brackets:
+            nodes.append(PlayNode("char", char))
+        i += 1
+    return tuple(nodes)
+
+def evaluate_play_nodes(nodes):
+    """ Creates the pattern data from parsed PlayNodes, returns a list object (not Pattern),
         and a boolean denoting if the list contains a nested list """
-    
-    string = PlayString(string)
+
     items  = [] # The actual pattern
 
     layer_pattern = False
     contains_nest = False
-    
-    i = 0
-    
-    while i < len(string):
 
-        char = string[i]
+    for node in nodes:
 
-        # look for a '<>'
-        if char == "<":
+        kind = node.kind
 
-            # Parse the contents of the brackets if found
-            j = string.index(">", start=i+1)
-            s = string[i+1:j]
-            i = j
+        if kind == "char":
+
+            items.append( node.value )
 
-            chars, _ = feed(s)
+            layer_pattern = False
 
-            if len(chars) == 0:
+            continue
 
-                e = "Empty '<>' brackets in string"
+        chars, nested = evaluate_play_nodes(node.value)
 
-                raise ParseError(e)
+        # '<>' layers patterns. If we know we are layering, zip the last item
 
-            # If we know we are layering, zip the last item
+        if kind == "<":
 
             if layer_pattern:
 
@@ -118,61 +173,21 @@ def feed(string):
 
             contains_nest = True
 
-        # Look for || for specifying sample numbers
+        # '||' for specifying sample numbers
 
-        elif char == "|":
-
-            # Parse the contents of the brackets if found
-            j = string.next_char_index("|", start=i+1)
-            s = string[i+1:j]
-            i = j
-
-            chars, _ = feed(s)
-
-            if len(chars) == 0:
-
-                e = "Empty '||' delimeters in string"
-
-                raise ParseError(e)
-
-            try:
+        elif kind == "|":
 
-                assert(len(chars) == 2)
-
-            except AssertionError:
+            if len(chars) != 2:
 
                 e = "'||' delimeters must contain exactly 2 elements"
 
                 raise ParseError(e)
 
-            # First is our list of sample chars
-            
-            samp_chr = chars[0]
-
-            # Next is a list of integers for sample kw
-
-            samp_num = convert_to_int(chars[1])
-
-            # print(samp_chr, samp_num)
-
-            items.append(bar_type((samp_chr, samp_num)))
-
-        # Look for a '()'
-        elif char == "(":
-
-            # Parse the contents of the brackets if found
-            j = string.index(")", start=i+1)
-            
-            s = string[i+1:j]
-            i = j
-
-            chars, _ = feed(s)
-
-            if len(chars) == 0:
+            # First is our list of sample chars, next is a list of integers for sample kw
 
-                e = "Empty '()' brackets in string"
+            items.append(bar_type((chars[0], convert_to_int(chars[1]))))
 
-                raise ParseError(e)
+        elif kind == "(":
 
             items.append( chars ) # add the nested list
 
@@ -180,40 +195,15 @@ def feed(string):
 
             contains_nest = True
 
-        # Look for a '{}'
-        elif char == "{":
-
-            # Parse the contents of the brackets if found
-            j = string.index("}", start=i+1)
-            s = string[i+1:j]
-            i = j
-
-            chars, _ = feed(s)
-
-            if len(chars) == 0:
-
-                e = "Empty '{}' brackets in string"
-
-                raise ParseError(e)
+        elif kind == "{":
 
             items.append( braces_type(chars) )
 
             layer_pattern = False
-                
-        # Look for a '[]'
-        elif char == "[":
-            
-            j = string.index("]", start=i+1)
-            s = string[i+1:j]
-            i = j
-
-            chars, contains_nest = feed(s)
-
-            if len(chars) == 0:
 
-                e = "Empty '[]' brackets in string"
+        elif kind == "[":
 
-                raise ParseError(e)
+            contains_nest = nested
 
             # Un-nest
             if contains_nest:
@@ -230,32 +220,64 @@ def feed(string):
 
                 items.append( new_chars )
 
-                layer_pattern = False
-
             else:
 
-                new_chars = []
+                items.append( square_type(list(chars)) )
+
+            layer_pattern = False
 
-                for char in chars:
+    return items, contains_nest
 
-                    new_chars.append(char)
+def feed(string):
+    """ Used to recursively parse nested strings, returns a list object (not Pattern),
+        and a boolean denoting if the list contains a nested list """
+    return evaluate_play_nodes(play_string_cache.get(string))
 
-                items.append( square_type(new_chars) )
+class PlayStringCache:
+    """ Small LRU cache of string -> parsed PlayNodes. The nodes are immutable, so new
+        pattern data, including any random generators, is created from them each time """
+    def __init__(self, size=256):
+        self.size = size
+        self.data = OrderedDict()
 
-                layer_pattern = False
+    def __len__(self):
+        return len(self.data)
 
-        # Add single character to list
+    def clear(self):
+        self.data.clear()
 
-        elif char not in ")]}>|":
+    def set_size(self, size):
+        """ Sets the maximum number of strings to store. Use 0 to disable the cache """
+        self.size = int(size)
+        while len(self.data) > max(self.size, 0):
+            self.data.popitem(last=False)
 
-            items.append( char )
+    def get(self, string):
+        """ Returns the parsed PlayNodes for a string """
 
-            layer_pattern = False
+        string = str(string)
 
-        # Increase iterator
-        i += 1
+        try:
 
-    return items, contains_nest
+            nodes = self.data.pop(string)
+
+        except KeyError:
+
+            nodes = parse_play_string(string)
+
+            if self.size <= 0:
+
+                return nodes
+
+            if len(self.data) >= self.size:
+
+                self.data.popitem(last=False)
+
+        self.data[string] = nodes
+
+        return nodes
+
+play_string_cache = PlayStringCache()
 
 
 @PatternMethod
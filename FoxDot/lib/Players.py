@@ -125,12 +125,19 @@
 from __future__ import absolute_import, division, print_function
 
 import itertools
+import threading
+from bisect import bisect_left
 from functools import partial
 
 from os.path import dirname
 from random import shuffle, choice
 from copy import copy, deepcopy
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 from .Settings import SamplePlayer, LoopPlayer
 from .Code import WarningMsg, debug_stdout
 from .SCLang.SynthDef import SynthDefProxy, SynthDef, SynthDefs
@@ -284,6 +291,7 @@ class Player(Repeatable):
 
         # The string representation of the degree of the player
         self.playstring = ""
+        self.sample_keys = frozenset()
 
         # Information used in generating OSC messages
         self.buf_delay = []
@@ -307,11 +315,27 @@ class Player(Repeatable):
         self.event = {}
         self.accessed_keys = []
 
+        # Attributes that need calculating for each event (see `Player.get_event`)
+
+        self.attr_kinds = None
+
+        # Mix notes into one group of effect nodes on the server (see `Player.share_effects`)
+
+        self.shared_fx = False
+
         # Used for checking clock updates
 
         self.current_dur = None
         self.old_pattern_dur = None
         self.old_dur = None
+        self.dur_offsets = None
+
+        # Events rendered ahead of time by the look-ahead thread (see `Player.lookahead`)
+
+        self.lookahead_size = 0
+        self.rendered_events = {}
+        self.render_version = 0
+        self.render_lock = threading.Lock()
         
         self.isplaying = False
         self.isAlive = True
@@ -360,6 +384,25 @@ class Player(Repeatable):
     @classmethod
     def set_sample_bank(cls, sample_bank):
         cls.samples = sample_bank
+        cls.samples.setInUse(cls.get_buffers_in_use)
+
+    @classmethod
+    def get_buffers_in_use(cls):
+        """ Returns the buffer numbers used by players that are currently playing """
+        bufnums = set()
+        if cls.metro is None:
+            return bufnums
+        for player in list(cls.metro.playing):
+            if player.synthdef == SamplePlayer:
+                for symbol, index in player.sample_keys:
+                    buf = player.samples.getLoadedBuffer(symbol, index)
+                    if buf is not None:
+                        bufnums.add(buf.bufnum)
+            else:
+                for value in flatten_values(player.attr.get("buf", [])):
+                    if isinstance(value, int):
+                        bufnums.add(value)
+        return bufnums
 
     def __hash__(self):
         return hash(self.id) # could be problematic if there are id clashes?
@@ -463,9 +506,15 @@ class Player(Repeatable):
 
                     self.test_for_circular_reference(item, name)
 
-                # Update the attribute dict if no error
+                # Update the attribute dict if no error, which may be being read by the look-ahead thread
                 
-                self.attr[name] = value
+                with self.render_lock:
+
+                    self.attr[name] = value
+
+                # Any events rendered ahead of time are now out of date
+
+                self.clear_rendered_events()
 
                 # Remove from the stored pattern dict / call those
 
@@ -477,6 +526,12 @@ class Player(Repeatable):
 
                     self.modifier = value
 
+                # Keep track of which samples are used by a playing player
+
+                if self.synthdef == SamplePlayer and name in ("degree", "sample") and self.isplaying:
+
+                    self.preload_samples()
+
                 # Update any playerkey
 
                 if name in self.__dict__:
@@ -659,41 +714,43 @@ class Player(Repeatable):
 
                 print("TypeError: Innappropriate argument type for 'dur'")
 
-        # Get the current state 
+        # Get the current state, using the pre-rendered event if there is one
+
+        rendered = self.get_rendered_event()
+
+        if rendered is None:
 
-        self.get_event() 
+            self.get_event()
+
+        else:
+
+            self.event = rendered.event
 
         # Play the note
         
         if not isinstance(self.event["dur"], rest):
 
-            try:
-        
-                self.send(verbose=(self.metro.solo == self and kwargs.get('verbose', True)))
+            verbose = (self.metro.solo == self and kwargs.get('verbose', True))
 
-            except Exception as err:
+            try:
 
-                print("Error in Player {}: {}".format(self.id, err))
+                if rendered is None:
         
-        # If using custom bpm
+                    self.send(verbose=verbose)
 
-        dur = self.event["dur"]
+                elif verbose:
 
-        if self.event['bpm'] is not None:
+                    for bundle in rendered.bundles:
 
-            try:
+                        self.queue_block.append_osc_message(bundle)
 
-                tempo_shift = float(self.metro.bpm) / float(self.event['bpm'])
-
-            except (AttributeError, TypeError, ZeroDivisionError):
-
-                tempo_shift = 1
+            except Exception as err:
 
-            dur *= tempo_shift
+                print("Error in Player {}: {}".format(self.id, err))
 
         # Schedule the next event (could move before get_event and use the index for get_event)
 
-        self.event_index = self.event_index + dur
+        self.event_index = self.event_index + self.get_event_dur(self.event)
 
         self.metro.schedule(self, self.event_index, kwargs={})
 
@@ -702,8 +759,34 @@ class Player(Repeatable):
         self.event_n += 1 
         self.notes_played += 1
 
+        # Render the next events in the background
+
+        if self.lookahead_size > 0:
+
+            self.renderer.request(self, self.event_n, self.event_index)
+
         return
 
+    def get_event_dur(self, event):
+        """ Returns the number of beats until the event after `event`, taking
+            into account any custom bpm """
+
+        dur = event["dur"]
+
+        if event['bpm'] is not None:
+
+            try:
+
+                tempo_shift = float(self.metro.bpm) / float(event['bpm'])
+
+            except (AttributeError, TypeError, ZeroDivisionError):
+
+                tempo_shift = 1
+
+            dur *= tempo_shift
+
+        return dur
+
     def count(self, time=None, event_after=False):
         """ Counts the number of events that will have taken place between 0 and `time`. If
             `time` is not specified the function uses self.metro.now(). Setting `event_after`
@@ -718,15 +801,14 @@ class Player(Repeatable):
 
             self.current_dur = self.rhythm()
 
-        durations = list(map(get_first_item, self.current_dur)) # careful here
-        
-        total_dur = float(sum(durations))
+        durations, offsets, total_dur = self.get_dur_offsets()
 
         if total_dur == 0:
 
             WarningMsg("Player object has a total duration of 0. Set to 1")
 
             durations = [1]
+            offsets   = [0, 1.0]
             total_dur =  1 
             self.dur  =  1
     
@@ -746,42 +828,80 @@ class Player(Repeatable):
 
         if acc != now:
 
-            while True:
+            # Find the first duration that ends at or after `now` in the cumulative sums. These
+            # are rounded differently to adding each duration to `acc` so allow a small error
 
-                dur = float(modi(durations, n))
+            error = 1e-9 * max(1.0, abs(now))
 
-                if acc + dur == now:
+            start  = n % len(durations)
+            target = offsets[start] + (now - acc)
 
-                    acc += dur
+            k = bisect_left(offsets, target - error, start + 1)
 
-                    n += 1
+            while k == len(offsets):
 
-                    break
+                # Continue into the next cycle
 
-                elif acc + dur > now:
+                n   += len(durations) - start
+                acc += offsets[-1] - offsets[start]
 
-                    if event_after:
+                start  = 0
+                target = now - acc
 
-                        acc += dur
-                        n += 1
+                k = bisect_left(offsets, target - error, 1)
 
-                    break
+            if offsets[k] <= target + error:
 
-                else:
-                    
-                    acc += dur
-                    n += 1
+                # `now` is the end of a duration
+
+                n  += k - start
+                acc = now
+
+            elif event_after:
+
+                n   += k - start
+                acc += offsets[k] - offsets[start]
+
+            else:
+
+                n   += k - 1 - start
+                acc += offsets[k - 1] - offsets[start]
 
         # Returns value for self.event_n and self.event_index
 
         return n, acc
 
+    def get_dur_offsets(self):
+        """ Returns the first value of each duration in `self.current_dur`, a list of their
+            cumulative sum starting at 0, and their total. These are stored and re-used
+            until `self.current_dur` is replaced, which `dur_updated` only does when the
+            durations change """
+
+        if self.dur_offsets is None or self.dur_offsets[0] is not self.current_dur:
+
+            durations = list(map(get_first_item, self.current_dur)) # careful here
+
+            offsets = [0]
+            total = 0
+
+            for dur in durations:
+
+                total += float(dur)
+
+                offsets.append(total)
+
+            self.dur_offsets = (self.current_dur, durations, offsets, float(sum(durations)))
+
+        return self.dur_offsets[1:]
+
     def dur_updated(self):
         """ Returns True if the players duration has changed since the last call """
-        self.current_dur = self.rhythm()
-        if self.current_dur != self.old_dur:
-            self.old_dur = self.current_dur
+        current_dur = self.rhythm()
+        if current_dur != self.old_dur:
+            self.current_dur = self.old_dur = current_dur
             return True
+        # Keep the same list so that its cumulative durations can be re-used
+        self.current_dur = self.old_dur
         return False
 
     def rhythm(self):
@@ -869,6 +989,12 @@ class Player(Repeatable):
 
                 setattr(self, name, value)
 
+        # Start loading any new samples before they are played
+
+        if synthdef == SamplePlayer:
+
+            self.preload_samples()
+
         # Calculate new position if not already playing
 
         if self.isplaying is False:
@@ -904,6 +1030,24 @@ class Player(Repeatable):
 
         return self
 
+    def preload_samples(self):
+        """ Loads the buffers used by the symbols in this player's play string, for each
+            of its `sample` values or the sample given in "|x2|", on a background thread """
+
+        indices = set(int(value) for value in flatten_values(self.attr.get("sample", [0])) if isinstance(value, (int, float)))
+
+        indices = indices or set([0])
+
+        # Store which buffers are used so they're not freed while playing
+
+        self.sample_keys = frozenset(get_sample_keys(self.attr["degree"], indices))
+
+        for symbol, index in self.sample_keys:
+
+            self.samples.preload(symbol, (index,))
+
+        return
+
     def often(self, *args, **kwargs):
         """ Calls a method every 1/2 to 4 beats using `every` """
         return self.every(PRand(1, 8)/2, *args, **kwargs)
@@ -1105,9 +1249,11 @@ class Player(Repeatable):
         """ Reverses every attribute stream """
         for attr in self.attr:
             try:
-                self.attr[attr] = self.attr[attr].pivot(self.event_n)
+                with self.render_lock:
+                    self.attr[attr] = self.attr[attr].pivot(self.event_n)
             except AttributeError:
                 pass
+        self.clear_rendered_events()
         return self
 
     def shuffle(self):
@@ -1135,7 +1281,9 @@ class Player(Repeatable):
         """ Sets the attribute for self.key2 to self.key1
             altered with a mapping dictionary.
         """
-        self.attr[key2] = self.attr[key1].map(mapping)
+        with self.render_lock:
+            self.attr[key2] = self.attr[key1].map(mapping)
+        self.clear_rendered_events()
         return self
 
     def smap(self, kwargs):
@@ -1176,10 +1324,12 @@ class Player(Repeatable):
     def __sub__(self, data):
         """ Change the degree modifier stream """
         self.mod_data = 0 - data
-        if self.synthdef == SamplePlayer:
-            self.attr['sample'] = self.modifier + self.mod_data
-        else:
-            self.attr['degree'] = self.modifier + self.mod_data
+        with self.render_lock:
+            if self.synthdef == SamplePlayer:
+                self.attr['sample'] = self.modifier + self.mod_data
+            else:
+                self.attr['degree'] = self.modifier + self.mod_data
+        self.clear_rendered_events()
         return self
 
     def __mul__(self, data):
@@ -1456,6 +1606,41 @@ class Player(Repeatable):
 
         return attr_value
 
+    def classify_attrs(self):
+        """ Classifies each attribute as "constant", "pattern", "timevar", or "playerkey" when
+            the attributes have changed. Returns a dict of attributes in order with the values of
+            the constant ones, and a list of the attributes that must be calculated each event.
+            The kinds are used by `get_event` and `get_shared_fx_key`. """
+
+        values = tuple(self.attr.values())
+        key = (tuple(self.attr.keys()), tuple(map(id, values)))
+
+        if self.attr_kinds is None or self.attr_kinds[0] != key:
+
+            kinds    = {}
+            template = {}
+            dynamic  = []
+
+            for attr, pattern in self.attr.items():
+
+                kinds[attr] = get_attr_kind(pattern)
+
+                if kinds[attr] == "constant":
+
+                    template[attr] = self.now(attr)
+
+                else:
+
+                    template[attr] = None
+
+                    dynamic.append(attr)
+
+            # Keep a reference to the values so their ids are not re-used
+
+            self.attr_kinds = (key, values, kinds, template, dynamic)
+
+        return self.attr_kinds[3], self.attr_kinds[4]
+
     def get_prime_funcs(self, event):
         """ Finds and PGroupPrimes in event and returns the modulated event dictionary """
 
@@ -1541,7 +1726,28 @@ class Player(Repeatable):
     def get_event(self):
         """ Returns a dictionary of attr -> now values """
 
-        self.event = dict(map(lambda attr: (attr, self.now(attr)), self.attr.keys()))
+        template, dynamic = self.classify_attrs()
+
+        kinds = self.attr_kinds[2]
+
+        # Only attributes that aren't constant need to be calculated
+
+        self.event = template.copy()
+
+        for attr in dynamic:
+
+            pattern = self.attr[attr]
+
+            # Values of patterns of plain numbers don't need converting. TimeVars and
+            # player keys are found using `now`
+
+            if kinds[attr] == "pattern" and type(pattern) is Pattern and pattern.is_numeric():
+
+                self.event[attr] = pattern.data[self.event_n % len(pattern.data)]
+
+            else:
+
+                self.event[attr] = self.now(attr)
 
         self.event = self.unduplicate_durs(self.event)
 
@@ -1553,81 +1759,219 @@ class Player(Repeatable):
 
         return self
 
+    # --- Look-ahead rendering of events
 
-    def send(self, timestamp=None, verbose=True, **kwargs):
-        """ Goes through the  current event and compiles osc messages and sends to server via the tempo clock """
+    def lookahead(self, n=4):
+        """ Compiles the OSC bundles for the next `n` events on a background thread so
+            that only sending them is done on the beat. Events using values that can only
+            be known on the beat, such as a `var` or another player's attribute, are
+            calculated as normal. Use `lookahead(0)` to turn off. """
+        self.lookahead_size = max(int(n), 0)
+        self.clear_rendered_events()
+        return self
 
-        timestamp = timestamp if timestamp is not None else self.queue_block.time
+    def clear_rendered_events(self):
+        """ Discards any events rendered ahead of time """
+        with self.render_lock:
+            self.render_version += 1
+            self.rendered_events.clear()
+        return
 
-        # self.do_bang = False
+    def render_context(self):
+        """ Returns the values, other than attributes, that a rendered event depends on.
+            Returns None if these can change over time and events can't be rendered ahead. """
 
-        for i in range(self.get_event_length(**kwargs)):
+        metro = self.metro
 
-            self.send_osc_message(self.event, i, timestamp=timestamp, verbose=verbose, **kwargs)
+        if isinstance(metro.bpm, TimeVar) or isinstance(metro.nudge, TimeVar) or isinstance(self.scale, TimeVar):
 
-        # if self.do_bang:
+            return None
 
-        #     self.bang()
+        if metro.midi_clock is not None or metro.espgrid is not None:
 
-        return
+            return None
 
-    def send_osc_message(self, event, index, timestamp=None, verbose=True, **kwargs):
-        """ Compiles and sends an individual OSC message created by recursively unpacking nested PGroups """
+        return (self.synthdef, metro.bpm, metro.bpm_start_beat, metro.bpm_start_time, metro.latency,
+                metro.nudge, metro.hard_nudge, tuple(self.scale), float(Root.default))
 
-        packet = {}
+    def get_rendered_event(self):
+        """ Returns the pre-rendered event for the current beat if it is still valid """
 
-        event=event.copy()
-        event.update(kwargs)
+        if self.lookahead_size == 0:
 
-        for key, value in event.items():
+            return None
 
-            # If we can index a value, trigger a new OSC message to send OSC messages for each
+        with self.render_lock:
 
-            # value = kwargs.get(key, value)
+            rendered = self.rendered_events.pop(self.event_n, None)
 
-            if isinstance(value, PGroup):
+            for n in [n for n in self.rendered_events if n < self.event_n]:
 
-                new_event = {}
+                del self.rendered_events[n]
 
-                for new_key, new_value in event.items():
+        if rendered is None or len(self.accessed_keys) > 0:
 
-                    # new_value = kwargs.get(new_key, new_value)
+            return None
 
-                    if isinstance(new_value, PGroup):
+        if rendered.beat != self.event_index or rendered.context != self.render_context():
 
-                        new_event[new_key]  = new_value[index]
+            return None
 
-                    else:
+        return rendered
 
-                        new_event[new_key] = new_value
+    def render_event(self, index, beat):
+        """ Calculates the event dictionary and OSC bundles for event number `index`, which
+            occurs at `beat`. Returns None if the event depends on values that can only be
+            known on the beat. """
 
-                # Recursively unpack and send messages
+        event = {}
 
-                for i in range(self.get_event_length(new_event)):
+        # Attributes are changed on other threads while holding `render_lock`
 
-                    self.send_osc_message(new_event, i, timestamp, verbose)
+        with self.render_lock:
 
-                return
+            attrs = list(self.attr.items())
+
+        for attr, pattern in attrs:
+
+            if isinstance(pattern, GeneratorPattern):
+
+                return None
+
+            if len(pattern) > 0:
+
+                value = pattern[index]
+
+                if not is_static_value(value):
+
+                    return None
+
+                if value is not None and not isinstance(value, (int, float)):
+
+                    value = self.unpack(value)
 
             else:
 
-                # If it is a number, use the numbers (check for kwargs override)
-                
-                packet[key] = value
+                value = 0
+
+            event[attr] = value
 
-        # Special case modulations
+        event = self.unduplicate_durs(event)
 
-        if ("amp" in packet) and ("amplify" in packet):
+        event = self.get_prime_funcs(event)
 
-            packet["amp"] = packet["amp"] * packet["amplify"]
+        bundles = []
 
-        # Send compiled messages
+        if not isinstance(event["dur"], rest):
 
-        self.push_osc_to_server(packet, timestamp, verbose, **kwargs)
+            timestamp = self.metro.osc_message_time_at_beat(beat)
+
+            for i in range(self.get_event_length(event)):
+
+                self.send_osc_message(event, i, timestamp=timestamp, bundles=bundles)
+
+            # Shared effect groups are only created or changed on the beat
+
+            if any(bundle is None for bundle in bundles):
+
+                return None
+
+        return RenderedEvent(beat, event, bundles)
+
+    def render_ahead(self, event_n, event_index):
+        """ Renders the next `lookahead_size` events starting with event number `event_n`,
+            which occurs at `event_index`. Called from the look-ahead thread. """
+
+        with self.render_lock:
+
+            version = self.render_version
+
+        context = self.render_context()
+
+        if context is None or len(self.accessed_keys) > 0:
+
+            return
+
+        beat = event_index
+
+        for n in range(event_n, event_n + self.lookahead_size):
+
+            with self.render_lock:
+
+                rendered = self.rendered_events.get(n, None)
+
+            if rendered is None or rendered.beat != beat:
+
+                rendered = self.render_event(n, beat)
+
+                if rendered is None:
+
+                    return
+
+                rendered.context = context
+
+                with self.render_lock:
+
+                    # Stop if an attribute was changed while rendering
+
+                    if self.render_version != version:
+
+                        return
+
+                    self.rendered_events[n] = rendered
+
+            beat = beat + self.get_event_dur(rendered.event)
 
         return
 
-    def push_osc_to_server(self, packet, timestamp, verbose=True, **kwargs):
+
+    def send(self, timestamp=None, verbose=True, **kwargs):
+        """ Goes through the  current event and compiles osc messages and sends to server via the tempo clock """
+
+        timestamp = timestamp if timestamp is not None else self.queue_block.time
+
+        # self.do_bang = False
+
+        for i in range(self.get_event_length(**kwargs)):
+
+            self.send_osc_message(self.event, i, timestamp=timestamp, verbose=verbose, **kwargs)
+
+        # if self.do_bang:
+
+        #     self.bang()
+
+        return
+
+    def send_osc_message(self, event, index, timestamp=None, verbose=True, bundles=None, **kwargs):
+        """ Compiles and sends an individual OSC message for each combination of values in nested PGroups.
+            If `bundles` is a list, the compiled messages are added to it instead of being sent. """
+
+        if kwargs:
+
+            event = event.copy()
+            event.update(kwargs)
+
+        # Keyword arguments are only used when there are no PGroups to unpack
+
+        if any(isinstance(value, PGroup) for value in event.values()):
+
+            kwargs = {}
+
+        for packet in expand_pgroups(event, index):
+
+            # Special case modulations
+
+            if ("amp" in packet) and ("amplify" in packet):
+
+                packet["amp"] = packet["amp"] * packet["amplify"]
+
+            # Send compiled messages
+
+            self.push_osc_to_server(packet, timestamp, verbose, bundles, **kwargs)
+
+        return
+
+    def push_osc_to_server(self, packet, timestamp, verbose=True, bundles=None, **kwargs):
         """ Adds message head, calculating frequency then sends to server if verbose is True and 
             amp/bufnum values meet criteria """
 
@@ -1645,11 +1989,23 @@ class Player(Repeatable):
 
             synthdef = self.get_synth_name(message.get("buf", 0)) # to send to play1 or play2
 
-            compiled_msg = self.metro.server.get_bundle(synthdef, message, timestamp = timestamp + delay)
+            if self.shared_fx:
+
+                compiled_msg = self.metro.server.get_bundle(synthdef, message, timestamp = timestamp + delay, shared_fx = self.get_shared_fx_key(), prerender = bundles is not None)
+
+            else:
+
+                compiled_msg = self.metro.server.get_bundle(synthdef, message, timestamp = timestamp + delay)
 
             # We can set a condition to only send messages
 
-            self.queue_block.append_osc_message(compiled_msg)
+            if bundles is not None:
+
+                bundles.append(compiled_msg)
+
+            else:
+
+                self.queue_block.append_osc_message(compiled_msg)
 
             # self.do_bang = True
 
@@ -1681,6 +2037,19 @@ class Player(Repeatable):
                 pos = 0 
  
             buf  = self.samples.getBufferFromSymbol(str(degree), sample).bufnum
+
+            # Samples chosen by generators aren't known until they are played. A new set is
+            # stored, rather than changing it, as other threads use it to find buffers in use
+
+            try:
+
+                if (str(degree), sample) not in self.sample_keys:
+
+                    self.sample_keys = self.sample_keys.union([(str(degree), sample)])
+
+            except TypeError:
+
+                pass
             
             message.update( {'buf': buf,'pos': pos} )
 
@@ -1789,6 +2158,33 @@ class Player(Repeatable):
             synthdef = str(self.synthdef)
         return synthdef
 
+    def share_effects(self, on=True):
+        """ Plays effects that don't depend on the length of a note, such as `room` or `lpf`, with
+            one group of effect nodes on the server that all of this player's notes are mixed into,
+            instead of adding the effect nodes to every note. Only used while the effects' attributes
+            are constant or TimeVars. Use `share_effects(False)` to turn off. """
+        self.shared_fx = bool(on)
+        self.clear_rendered_events()
+        if not self.shared_fx:
+            self.metro.server.free_shared_fx(self.id)
+        return self
+
+    def get_shared_fx_key(self):
+        """ Returns the key of this player's shared effect group on the server, or None if
+            the effect attributes can change from note to note """
+        if self.id is None:
+            return None
+        template, dynamic = self.classify_attrs()
+        kinds = self.attr_kinds[2]
+        for fx in FxList.shared():
+            for key in FxList[fx].args:
+                kind = kinds.get(key, "constant")
+                if kind == "timevar":
+                    continue
+                if kind != "constant" or isinstance(template.get(key, None), PGroup):
+                    return None
+        return self.id
+
     def addfx(self, **kwargs):
         """ Not implemented - add an effect to the SynthDef bus on SuperCollider
             after it has been triggered. """
@@ -1804,6 +2200,10 @@ class Player(Repeatable):
         
         self.reset()
 
+        if self.shared_fx:
+
+            self.metro.server.free_shared_fx(self.id)
+
         if self in self.metro.playing:
         
             self.metro.playing.remove(self)
@@ -1976,7 +2376,9 @@ class Player(Repeatable):
         return
 
     def multiply(self, n=2):
-        self.attr['degree'] = self.attr['degree'] * n
+        with self.render_lock:
+            self.attr['degree'] = self.attr['degree'] * n
+        self.clear_rendered_events()
         return self
 
     def degrade(self, amount=0.5):
@@ -2190,5 +2592,175 @@ class rest(object):
     def __float__(self):
         return float(self.dur)
 
+class RenderedEvent(object):
+    """ An event dictionary and its compiled OSC bundles, calculated ahead of the beat """
+    def __init__(self, beat, event, bundles):
+        self.beat = beat
+        self.event = event
+        self.bundles = bundles
+        self.context = None
+
+class EventRenderer(object):
+    """ Background thread that renders the upcoming events of players using `Player.lookahead` """
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = None
+
+    def request(self, player, event_n, event_index):
+        """ Asks for the events of `player` from `event_n` onwards to be rendered """
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run)
+            self.thread.daemon = True
+            self.thread.start()
+        self.jobs.put((player, event_n, event_index))
+        return
+
+    def run(self):
+        while True:
+            player, event_n, event_index = self.jobs.get()
+            try:
+                player.render_ahead(event_n, event_index)
+            except Exception:
+                # Patterns can be changed while being read, so leave the
+                # events to be calculated, and any errors shown, on the beat
+                player.clear_rendered_events()
+
+Player.renderer = EventRenderer()
+
+Samples.setInUse(Player.get_buffers_in_use)
+
+def is_static_value(value):
+    """ Returns False if `value` depends on the time it is evaluated e.g. a `TimeVar` """
+    if isinstance(value, PGroup):
+        return all(is_static_value(item) for item in value.data)
+    return not isinstance(value, (TimeVar, NumberKey, GeneratorPattern))
+
+def flatten_values(pattern):
+    """ Returns a list of the values in a pattern and any nested patterns or PGroups """
+    values = []
+    items  = [pattern]
+    while items:
+        item = items.pop()
+        if isinstance(item, metaPattern) and not isinstance(item, (GeneratorPattern, TimeVar)):
+            items.extend(reversed(item.data))
+        elif isinstance(item, (list, tuple)):
+            items.extend(reversed(item))
+        else:
+            values.append(item)
+    return values
+
+def get_sample_keys(degree, indices):
+    """ Returns a set of the (symbol, sample) pairs used by a play string pattern. Symbols
+        in a PGroupOr e.g. "|x2|" use its sample, and other symbols use each of `indices` """
+    keys  = set()
+    items = [degree]
+    while items:
+        item = items.pop()
+        if isinstance(item, PGroupOr):
+            samples = [int(value) for value in flatten_values(item.meta[0]) if isinstance(value, (int, float))]
+            keys.update((symbol, index) for symbol in flatten_values(item.data) if isinstance(symbol, str) for index in samples)
+        elif isinstance(item, metaPattern) and not isinstance(item, (GeneratorPattern, TimeVar)):
+            items.extend(item.data)
+        elif isinstance(item, (list, tuple)):
+            items.extend(item)
+        elif isinstance(item, str):
+            keys.update((item, index) for index in indices)
+    return keys
+
+def get_attr_kind(pattern):
+    """ Returns "constant" if a Player attribute is a single number or string, "timevar" or
+        "playerkey" if it contains a TimeVar or another player's key, otherwise "pattern" """
+
+    if type(pattern) is Pattern:
+
+        if len(pattern.data) == 0:
+
+            return "constant"
+
+        if len(pattern.data) == 1 and (pattern.data[0] is None or type(pattern.data[0]) in (int, float, str)):
+
+            return "constant"
+
+    kind  = "pattern"
+    items = [pattern]
+
+    while items:
+
+        item = items.pop()
+
+        if isinstance(item, TimeVar):
+
+            return "timevar"
+
+        elif isinstance(item, NumberKey):
+
+            kind = "playerkey"
+
+        elif isinstance(item, metaPattern) and not isinstance(item, GeneratorPattern):
+
+            items.extend(item.data)
+
+    return kind
+
 class PlayerKeyException(Exception):
     pass
+
+def expand_pgroups(event, index, packet=None):
+    """ Yields a flat packet dict for each combination of values in the nested PGroups of `event`,
+        using `index` for the outermost PGroups. Gives the same packets, in the same order, as
+        unpacking each level recursively but without building a new dict per level. The same
+        `packet` dict is cleared and re-used each time so copy it if it needs to be kept. """
+
+    if packet is None:
+
+        packet = {}
+
+    keys   = list(event.keys())
+    values = list(event.values())
+
+    # Only values that are PGroups can be unpacked any further, so track their positions
+
+    groups = [i for i, value in enumerate(values) if isinstance(value, PGroup)]
+
+    stack = [(values, groups, index)]
+
+    while stack:
+
+        values, groups, index = stack.pop()
+
+        if groups:
+
+            values = list(values)
+
+            new_groups = []
+
+            for i in groups:
+
+                value = values[i][index]
+
+                if isinstance(value, PGroup):
+
+                    new_groups.append(i)
+
+                values[i] = value
+
+            sizes = [len(values[i]) for i in new_groups]
+
+            if len(new_groups) < len(values):
+
+                sizes.append(1)
+
+            # Add in reverse so the first value is unpacked first
+
+            for i in range(max(sizes) - 1, -1, -1):
+
+                stack.append((values, new_groups, i))
+
+        else:
+
+            packet.clear()
+            packet.update(zip(keys, values))
+
+            yield packet
+
+    return
@@ -6,8 +6,14 @@ from .Root import Root
 
 from random import choice
 from copy import copy
+from collections import OrderedDict
 import math
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 def miditofreq(midinote):
     """ Converts a midi number to frequency """
     return 440 * (2 ** ((midinote - 69.0)/12.0))
@@ -66,6 +72,14 @@ def get_freq_and_midi(degree, octave, root, scale):
 
         scale = scale.now()
 
+    # Most notes are repeated, so look them up first
+
+    result = freq_cache.get(degree, octave, root, scale)
+
+    if result is not None:
+
+        return result
+
     if isinstance(scale, ScaleType):
 
         freq, midinote = scale.get_freq(degree, octave, root, get_midi=True)
@@ -77,6 +91,258 @@ def get_freq_and_midi(degree, octave, root, scale):
 
     return freq, midinote
 
+def get_freqs_and_midis(degrees, octaves, roots, scale):
+    """ Batch version of `get_freq_and_midi`. Takes sequences of degrees and octaves / roots
+        (or single values used for every degree) and returns a tuple of frequencies and
+        midinotes. These are NumPy arrays if NumPy is installed, otherwise lists. """
+
+    if hasattr(scale, "now"):
+
+        scale = scale.now()
+
+    degrees = [float(degree) for degree in degrees]
+    octaves = _broadcast(octaves, len(degrees))
+    roots   = _broadcast(roots, len(degrees))
+
+    table = get_scale_table(scale)
+
+    if table is None:
+
+        # Scale can't be tabulated, e.g. frequencies, so calculate each note
+
+        result = [get_freq_and_midi(*note, scale=scale) for note in zip(degrees, octaves, roots)]
+
+        freqs     = [freq for freq, midinote in result]
+        midinotes = [midinote for freq, midinote in result]
+
+        if numpy is not None:
+
+            return numpy.array(freqs, dtype=float), numpy.array(midinotes, dtype=float)
+
+        return freqs, midinotes
+
+    if numpy is not None:
+
+        pitches, diffs, steps = (numpy.array(table[0], dtype=float), numpy.array(table[1], dtype=float), table[2])
+
+        degrees = numpy.array(degrees, dtype=float)
+        octaves = numpy.array(octaves, dtype=float)
+        roots   = numpy.array(roots, dtype=float)
+
+        lo     = numpy.floor(degrees)
+        octave = octaves + (lo // len(pitches))
+        index  = (lo % len(pitches)).astype(int)
+
+        micro = degrees - lo
+        micro = numpy.where(micro > 0, micro * diffs[index], micro)
+
+        midinotes = steps * octave + roots + pitches[index] + micro
+        freqs     = 440 * numpy.power(2.0, (midinotes - 69.0) / 12.0)
+
+        return freqs, midinotes
+
+    midinotes = [table_midi(table, degree, float(octave), float(root)) for degree, octave, root in zip(degrees, octaves, roots)]
+    freqs     = [miditofreq(midinote) for midinote in midinotes]
+
+    return freqs, midinotes
+
+def _broadcast(values, size):
+    """ Returns `values` as a list of length `size`, repeating single values """
+    if isinstance(values, (list, tuple, Pattern)) or (numpy is not None and isinstance(values, numpy.ndarray)):
+        values = list(values)
+        if len(values) != size:
+            raise ValueError("Expected {} values but got {}".format(size, len(values)))
+        return values
+    return [values] * size
+
+def get_scale_key(scale):
+    """ Returns a hashable snapshot of a scale's contents, or None if the scale
+        cannot be described by a table of pitches (e.g. a frequency scale) """
+
+    if isinstance(scale, _DefaultScale):
+
+        scale = scale.scale
+
+    try:
+
+        if isinstance(scale, FreqScalePattern):
+
+            return None
+
+        elif isinstance(scale, PentatonicScalePattern):
+
+            data = get_scale_key(scale.data)
+
+            if data is None:
+
+                return None
+
+        elif isinstance(scale, ScalePattern):
+
+            if isinstance(scale.data, TimeVar):
+
+                return None
+
+            data = tuple(scale.data)
+
+        elif isinstance(scale, ScaleType):
+
+            return None
+
+        else:
+
+            key = (list, tuple(scale))
+
+            hash(key)
+
+            return key
+
+        key = (scale.__class__, data, tuple(scale.tuning), len(scale.tuning), scale.steps)
+
+        hash(key)
+
+    except TypeError:
+
+        return None
+
+    return key
+
+def get_scale_table(scale):
+    """ Returns a tuple of (pitches, microtone step sizes, steps per octave) used to calculate
+        midinotes in `scale`, or None if the scale cannot be tabulated """
+
+    if isinstance(scale, _DefaultScale):
+
+        scale = scale.scale
+
+    if get_scale_key(scale) is None:
+
+        return None
+
+    try:
+
+        if isinstance(scale, ScaleType):
+
+            steps   = scale.steps
+            pitches = [scale.get_tuned_note(i) for i in range(len(scale))]
+
+        else:
+
+            steps   = 12
+            pitches = [scale[i] for i in range(len(scale))]
+
+        ex_scale = list(scale) + [steps]
+
+        diffs = [ex_scale[i + 1] - scale[i] for i in range(len(pitches))]
+
+    except (TypeError, ValueError, IndexError, ZeroDivisionError):
+
+        return None
+
+    if len(pitches) == 0:
+
+        return None
+
+    return tuple(pitches), tuple(diffs), steps
+
+def table_midi(table, degree, octave, root):
+    """ Calculates a midinote from a table returned by `get_scale_table`. Degree, octave,
+        and root must be floats. Gives the same values as `midi` and `ScalePattern.get_midi_note` """
+
+    pitches, diffs, steps = table
+
+    lo = int(math.floor(degree))
+
+    octave = octave + (lo // len(pitches))
+    index  = lo % len(pitches)
+
+    micro = (degree - lo)
+
+    if micro > 0:
+
+        micro = micro * diffs[index]
+
+    midival = steps * octave         # Root note of scale
+    midival = midival + root         # Adjust for key
+    midival = midival + pitches[index] # Add the note
+    midival = midival + micro        # And any microtones
+
+    return midival
+
+class FreqCache:
+    """ Small LRU cache of (scale, degree, octave, root) -> (freq, midinote). Scales are
+        keyed on their contents so changing a scale, e.g. Scale.default, is picked up """
+    def __init__(self, size=1024):
+        self.size   = size
+        self.data   = OrderedDict()
+        self.tables = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def clear(self):
+        self.data.clear()
+        self.tables.clear()
+
+    def set_size(self, size):
+        """ Sets the maximum number of notes to store. Use 0 to disable the cache """
+        self.size = int(size)
+        while len(self.data) > max(self.size, 0):
+            self.data.popitem(last=False)
+
+    def get(self, degree, octave, root, scale):
+        """ Returns (freq, midinote) or None if the scale can't be cached """
+
+        if self.size <= 0:
+
+            return None
+
+        scale_key = get_scale_key(scale)
+
+        if scale_key is None:
+
+            return None
+
+        degree, octave, root = float(degree), float(octave), float(root)
+
+        key = (scale_key, degree, octave, root)
+
+        try:
+
+            result = self.data.pop(key)
+
+        except KeyError:
+
+            try:
+
+                table = self.tables[scale_key]
+
+            except KeyError:
+
+                table = get_scale_table(scale)
+
+                if table is None:
+
+                    return None
+
+                if len(self.tables) >= self.size:
+
+                    self.tables.clear()
+
+                self.tables[scale_key] = table
+
+            midinote = table_midi(table, degree, octave, root)
+
+            result = (miditofreq(midinote), midinote)
+
+            if len(self.data) >= self.size:
+
+                self.data.popitem(last=False)
+
+        self.data[key] = result
+
+        return result
+
 class ScaleType:
     pass
 
@@ -487,6 +753,8 @@ class __scale__:
 
 Scale = __scale__()
 
+freq_cache = FreqCache()
+
 
 # class Chord:
 #     def __init__(self):
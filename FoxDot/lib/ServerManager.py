@@ -8,6 +8,7 @@ if sys.version_info[0] > 2:
 else:
     import Queue as queue
 
+import heapq
 import json
 import socket
 import sys
@@ -15,8 +16,9 @@ import threading
 import time
 import itertools
 import os.path
+import struct
 
-from collections import namedtuple
+from collections import namedtuple, deque, Counter
 from threading import Thread
 
 from .Code import WarningMsg
@@ -26,6 +28,15 @@ if sys.version_info[0] > 2:
     from .OSC3 import *
 else:
     from .OSC import *
+    decodeOSCBuffer = decodeOSC
+
+# Size of the "#bundle" string and timetag at the start of an OSC bundle
+BUNDLE_HEADER_SIZE = 16
+
+# A note's group is freed by makeSound at most this many times its sus (plus
+# a 0.1 second fade). Keep in sync with Out in Effects/Util.py
+MAX_NOTE_DURATION = 8
+NOTE_RELEASE_TIME = 0.1
 
 # Keep in sync with Info.scd
 ServerInfo = namedtuple(
@@ -55,10 +66,184 @@ class OSCConnect(OSCClientWrapper):
         self.connect(address)
 
 
+class OSCStreamClient(OSCClientWrapper):
+    """ Sends OSC packets over TCP. By default packets are prefixed with their size as
+        an int32, as in OSC 1.0, which is what scsynth's TCP port expects. Use "slip" for
+        `framing` to frame them using SLIP instead, as in OSC 1.1, for servers that expect
+        it. Prints errors instead of raising them. """
+    SLIP_END     = b"\xc0"
+    SLIP_ESC     = b"\xdb"
+    SLIP_ESC_END = b"\xdb\xdc"
+    SLIP_ESC_ESC = b"\xdb\xdd"
+    def __init__(self, framing="size"):
+        if framing not in ("slip", "size"):
+            raise ValueError("Unknown framing '{}', use 'slip' or 'size'".format(framing))
+        OSCClientWrapper.__init__(self)
+        self.framing = framing
+    def connect(self, address):
+        try:
+            self._setSocket(socket.create_connection(address))
+            self.client_address = address
+        except socket.error as e:
+            self.client_address = None
+            self.print_error()
+    def send(self, msg, timeout=None):
+        if not self.socket:
+            return self.print_error()
+        try:
+            self.socket.sendall(self.frame(msg.getBinary()))
+        except socket.error as e:
+            self.print_error()
+    def frame(self, data):
+        """ Returns a packet framed for sending over the stream """
+        if self.framing == "size":
+            return struct.pack(">i", len(data)) + data
+        data = data.replace(self.SLIP_ESC, self.SLIP_ESC_ESC).replace(self.SLIP_END, self.SLIP_ESC_END)
+        return self.SLIP_END + data + self.SLIP_END
+    @classmethod
+    def unframe(cls, data):
+        """ Returns a list of the SLIP framed packets in `data` """
+        packets = []
+        for packet in data.split(cls.SLIP_END):
+            if len(packet) > 0:
+                packets.append(packet.replace(cls.SLIP_ESC_END, cls.SLIP_END).replace(cls.SLIP_ESC_ESC, cls.SLIP_ESC))
+        return packets
+    @staticmethod
+    def print_error():
+        if not OSCClientWrapper.error_printed:
+            print("Error sending message to SuperCollider server instance: make sure FoxDot quark is running and try again.")
+            OSCClientWrapper.error_printed = True
+
+
+class RecordingClient(object):
+    """ Decodes and counts the OSC packets it is sent instead of sending them, for testing
+        and benchmarking without a SuperCollider server. The last `size` decoded packets
+        are kept in `packets`. Use `decode=False` to only count datagrams and bytes. """
+    def __init__(self, size=1000, decode=True):
+        self.size = size
+        self.decode = decode
+        self.client_address = None
+        self.lock = threading.Lock()
+        self.reset()
+    def reset(self):
+        """ Clears the recorded packets and counts """
+        with self.lock:
+            self.packets = deque(maxlen=self.size)
+            self.datagrams = 0
+            self.bytes = 0
+            self.bundles = 0
+            self.messages = Counter()
+    def connect(self, address):
+        self.client_address = address
+    def close(self):
+        return
+    def send(self, msg, timeout=None):
+        data = msg.getBinary()
+        with self.lock:
+            self.datagrams += 1
+            self.bytes += len(data)
+            if self.decode:
+                packet = decodeOSCBuffer(data)
+                self.count(packet)
+                self.packets.append(packet)
+    def count(self, packet):
+        """ Counts the bundles, including nested bundles, and messages in a decoded packet """
+        if len(packet) > 0 and packet[0] == "#bundle":
+            self.bundles += 1
+            for item in packet[2:]:
+                self.count(item)
+        elif len(packet) > 0:
+            self.messages[packet[0]] += 1
+    def get_stats(self):
+        """ Returns a dict of the number of datagrams, bytes, bundles and messages received """
+        with self.lock:
+            return {"datagrams": self.datagrams, "bytes": self.bytes, "bundles": self.bundles,
+                    "messages": sum(self.messages.values())}
+
+
+# Clients that `SCLangServerManager.setTransport` can use to send messages to the server
+OSC_TRANSPORTS = {"udp": OSCClientWrapper, "tcp": OSCStreamClient, "tcp-slip": lambda: OSCStreamClient("slip"),
+                  "null": RecordingClient}
+
+
+class IDAllocator(object):
+    """ Allocates integer IDs from `first` in steps of `step`, stopping before
+        `stop` if given, and re-uses IDs that have been released, oldest first.
+        Keeps count of the number of IDs in use and the most in use at once. An ID
+        given out again with `share` is only re-used once every user has released it. """
+    def __init__(self, first, stop=None, step=1):
+        self.first = first
+        self.stop = stop
+        self.step = step
+        self.next = first
+        self.free = deque()
+        self.shared = Counter()
+        self.in_use = 0
+        self.peak = 0
+
+    def __len__(self):
+        return self.in_use
+
+    def alloc(self):
+        """ Returns an unused ID, or None if they are all in use """
+        if self.free:
+            value = self.free.popleft()
+        elif self.stop is None or self.next + self.step <= self.stop:
+            value = self.next
+            self.next += self.step
+        else:
+            return None
+        self.in_use += 1
+        if self.in_use > self.peak:
+            self.peak = self.in_use
+        return value
+
+    def share(self, value):
+        """ Returns an ID that is already allocated so that it has one more user """
+        self.shared[value] += 1
+        self.in_use += 1
+        return value
+
+    def release(self, value):
+        """ Makes an ID available to be allocated again """
+        self.in_use -= 1
+        if self.shared[value] > 0:
+            self.shared[value] -= 1
+        else:
+            self.free.append(value)
+
+
+class SharedEffectGroup(object):
+    """ A group of effect nodes on the server that all of a Player's notes are mixed
+        into through `bus`, followed by a node that plays the result. `effects` are
+        the names of the effects in order and `args` their current arguments. """
+    def __init__(self, group, bus, effects, nodes, args, out):
+        self.group = group
+        self.bus = bus
+        self.effects = effects
+        self.nodes = nodes
+        self.args = args
+        self.out = out
+        self.end_time = 0
+
+    def node_ids(self):
+        """ Returns the IDs of the group and every node in it """
+        return [self.group, self.out] + [self.nodes[fx] for fx in self.effects]
+
+
 class RequestTimeout(Exception):
     """ Raised if expecting a response from the server but received none """
 
 
+class OSCBufferRequestHandler(OSCRequestHandler):
+    """ Handles incoming OSC packets, decoding them in place with `decodeOSCBuffer` """
+    def handle(self):
+        decoded = decodeOSCBuffer(self.packet)
+        if not len(decoded):
+            return
+        self._unbundle(decoded)
+
+
 class BidirectionalOSCServer(OSCServer):
     """
     This is a combination client/server
@@ -68,6 +253,8 @@ class BidirectionalOSCServer(OSCServer):
 
     Note that this is not thread-safe, as the receive() method can discard messages
     """
+    RequestHandlerClass = OSCBufferRequestHandler
+
     def __init__(self, server_address=('localhost', 0), client=None, return_port=0):
         OSCServer.__init__(self, server_address, client, return_port)
         self._server_thread = None
@@ -131,6 +318,10 @@ class BidirectionalOSCServer(OSCServer):
 #  Create an abstract base class that could be sub-classed for users who want to send their OSC messages elsewhere
 
 class ServerManager(object):
+
+    # Largest datagram to send when combining OSC bundles
+    max_datagram_size = 8192
+
     def __init__(self, addr, port, osc_address="/s_new"):
         self.addr = addr
         self.port = port
@@ -157,6 +348,83 @@ class ServerManager(object):
         self.client.send( osc_message )
         return
 
+    def sendOSCBundles(self, bundles):
+        """ Sends a list of OSC bundles in fewer datagrams by combining the messages of
+            bundles with the same timetag into one bundle, no larger than `max_datagram_size`
+            bytes. Bundles aren't nested because scsynth runs each element of a bundle as a
+            message. Returns a list of the size in bytes of each datagram sent. """
+
+        sizes = []
+
+        # Group bundles by timetag, keeping the order they were added
+
+        timetags = []
+        groups = {}
+
+        for bundle in bundles:
+
+            # Midi messages are sent to SCLang so can't be combined
+
+            if bundle.address == OSC_MIDI_ADDRESS:
+
+                self.sendOSC(bundle)
+
+                sizes.append(len(bundle.getBinary()))
+
+                continue
+
+            if bundle.timetag not in groups:
+
+                timetags.append(bundle.timetag)
+
+                groups[bundle.timetag] = []
+
+            groups[bundle.timetag].append(bundle)
+
+        for timetag in timetags:
+
+            batch = []
+            batch_size = BUNDLE_HEADER_SIZE
+
+            for bundle in groups[timetag]:
+
+                size = len(bundle.message) # Messages are already prefixed by their size
+
+                if len(batch) > 0 and batch_size + size > self.max_datagram_size:
+
+                    sizes.append(self._send_batch(batch))
+
+                    batch = []
+                    batch_size = BUNDLE_HEADER_SIZE
+
+                batch.append(bundle)
+                batch_size += size
+
+            if len(batch) > 0:
+
+                sizes.append(self._send_batch(batch))
+
+        return sizes
+
+    def _send_batch(self, batch):
+        """ Sends a list of bundles with the same timetag as a single bundle containing
+            all of their messages and returns the number of bytes sent """
+
+        if len(batch) == 1:
+
+            bundle = batch[0]
+
+        else:
+
+            bundle = OSCBundle(time=batch[0].timetag)
+
+            bundle.message  = b"".join(item.message for item in batch)
+            bundle.typetags = "," + "".join(item.typetags[1:] for item in batch)
+
+        self.sendOSC(bundle)
+
+        return len(bundle.getBinary())
+
     def get_bundle(self, *args, **kwargs):
         bundle  = OSCBundle(time=kwargs.get("timestamp", 0))
         message = OSCMessage(self.osc_address)
@@ -172,18 +440,23 @@ class ServerManager(object):
         return
     def setFx(self, *args, **kwargs):
         return
+    def free_shared_fx(self, *args, **kwargs):
+        return
 
 class SCLangServerManager(ServerManager):
 
     fxlist    = None
     synthdefs = None
 
-    def __init__(self, addr, osc_port, sclang_port):
+    def __init__(self, addr, osc_port, sclang_port, transport="udp"):
 
         self.addr = addr
         self.port = osc_port
         self.SCLang_port = sclang_port
 
+        # How messages are sent to the server (see `setTransport`)
+        self.transport = transport
+
         self.midi_nudge = 0
 
         self.booted = False
@@ -200,16 +473,34 @@ class SCLangServerManager(ServerManager):
         self.max_busses = 100
         self.max_buffers = 1024
 
+        # Node and bus IDs can be requested from more than one thread
+        self.id_lock = threading.Lock()
+
+        # IDs are released when the note using them has finished (see `release_ids_at`)
+        self.node_ids = IDAllocator(self.node + 1)
+        self.bus_ids = IDAllocator(self.bus, self.max_busses, 2)
+        self.expiring_nodes = []
+        self.expiring_busses = []
+        self.id_order = itertools.count()
+        self.bus_overflows = 0
+
+        # Persistent effect groups of Players using `Player.share_effects`
+        self.shared_fx = {}
+
         self.fx_setup_done = False
         self.fx_names = {}
 
+        # Pre-packed bundles used by `compile_bundle`
+        self.use_bundle_templates = True
+        self.max_bundle_templates = 1024
+        self.bundle_templates = {}
+
         self.reset()
 
     def reset(self):
 
         # General SuperCollider OSC connection
-        self.client = OSCClientWrapper()
-        self.client.connect( (self.addr, self.port) )
+        self.client = self.new_client()
 
         # OSC Connection for custom OSCFunc in SuperCollider
         if GET_SC_INFO:
@@ -243,6 +534,28 @@ class SCLangServerManager(ServerManager):
 
         self.dumpOSC(0)
 
+    def new_client(self):
+        """ Returns a client for the current transport, connected to the server """
+        if isinstance(self.transport, str):
+            if self.transport not in OSC_TRANSPORTS:
+                raise ValueError("Unknown transport '{}', use one of {}".format(self.transport, sorted(OSC_TRANSPORTS)))
+            client = OSC_TRANSPORTS[self.transport]()
+        else:
+            client = self.transport
+        client.connect( (self.addr, self.port) )
+        return client
+
+    def setTransport(self, transport):
+        """ Sets how messages are sent to the server: "udp", "tcp" using the size-prefixed
+            packets that scsynth expects, "tcp-slip" using SLIP framed packets, "null" to record
+            the messages without sending them, or a client object with `connect`, `send` and
+            `close` methods. Returns the new client. """
+        client = self.client
+        self.transport = transport
+        self.client = self.new_client()
+        client.close()
+        return self.client
+
     def __str__(self):
         return "FoxDot ServerManager Instance -> {}:{}".format(self.addr, self.port)
 
@@ -251,8 +564,9 @@ class SCLangServerManager(ServerManager):
 
     def nextnodeID(self):
         """ Gets the next node ID to use in SuperCollider """
-        self.node += 1
-        return self.node
+        with self.id_lock:
+            self.node = self.node_ids.alloc()
+            return self.node
 
     def query(self):
         """ Prints debug status to SuperCollider console """
@@ -260,12 +574,62 @@ class SCLangServerManager(ServerManager):
         return
 
     def nextbusID(self):
-        """ Gets the next SuperCollider bus to use """
-        self.bus += 2
-        # Make sure we still have 2 audio channels available
-        if self.bus + 1 >= self.max_busses:
-            self.bus = self.num_input_busses + self.num_output_busses
-        return self.bus
+        """ Gets the next pair of SuperCollider audio busses to use """
+        with self.id_lock:
+            bus = self.bus_ids.alloc()
+            if bus is None:
+                # All busses are in use, so share with the note that ends first
+                self.bus_overflows += 1
+                bus = self._steal_bus()
+            self.bus = bus
+            return self.bus
+
+    def _steal_bus(self):
+        """ Takes the busses of the note that ends first, or shares the first busses if
+            none are due to be released. Either way the caller must release them. """
+        if len(self.expiring_busses) == 0:
+            return self.bus_ids.share(self.bus_ids.first)
+        return heapq.heappop(self.expiring_busses)[2]
+
+    def reset_ids(self):
+        """ Makes all node and bus IDs available again. Only use when no notes
+            are playing e.g. after freeing all nodes """
+        with self.id_lock:
+            self.node_ids = IDAllocator(1001)
+            self.bus_ids = IDAllocator(self.num_input_busses + self.num_output_busses, self.max_busses, 2)
+            self.expiring_nodes = []
+            self.expiring_busses = []
+            self.bus_overflows = 0
+            self.shared_fx = {}
+        return
+
+    def release_ids_at(self, end_time, nodes, bus=None):
+        """ Releases the node IDs and bus used by a note once `end_time` has passed """
+        with self.id_lock:
+            order = next(self.id_order)
+            heapq.heappush(self.expiring_nodes, (end_time, order, nodes))
+            if bus is not None:
+                heapq.heappush(self.expiring_busses, (end_time, order, bus))
+        return
+
+    def release_ids(self, now=None):
+        """ Releases the IDs of any notes that have ended by `now` """
+        now = time.time() if now is None else now
+        with self.id_lock:
+            while self.expiring_nodes and self.expiring_nodes[0][0] <= now:
+                for node in heapq.heappop(self.expiring_nodes)[2]:
+                    self.node_ids.release(node)
+            while self.expiring_busses and self.expiring_busses[0][0] <= now:
+                self.bus_ids.release(heapq.heappop(self.expiring_busses)[2])
+        return
+
+    def get_id_stats(self):
+        """ Returns a dict of the number of nodes and busses in use, the most used
+            at the same time, and how often busses ran out """
+        with self.id_lock:
+            return {"nodes": self.node_ids.in_use, "peak_nodes": self.node_ids.peak,
+                    "busses": self.bus_ids.in_use, "peak_busses": self.bus_ids.peak,
+                    "bus_overflows": self.bus_overflows}
 
     def sendOSC(self, osc_message):
         """ Sends an OSC message to the server. Checks for midi messages """
@@ -291,6 +655,7 @@ class SCLangServerManager(ServerManager):
         msg = OSCMessage("/g_freeAll")
         msg.append([1])
         self.client.send(msg)
+        self.reset_ids()
         return
 
     def setFx(self, fx_list):
@@ -324,8 +689,6 @@ class SCLangServerManager(ServerManager):
 
 
     def get_init_node(self, node, bus, group_id, synthdef, packet):
-    
-        msg = OSCMessage("/s_new")
 
         # Make sure messages release themselves after 8 * the duration at max (temp)
         
@@ -342,10 +705,8 @@ class SCLangServerManager(ServerManager):
             value = []
         
         osc_packet = ["startSound", node, 0, group_id, 'bus', bus, "sus", max_sus] + value
-
-        msg.append( osc_packet )
         
-        return msg, node
+        return osc_packet, node
 
     def get_control_effect_nodes(self, node, bus, group_id, packet):
 
@@ -366,19 +727,13 @@ class SCLangServerManager(ServerManager):
                 # Get next node ID
                 node, last_node = self.nextnodeID(), node
             
-                msg = OSCMessage("/s_new")
-            
                 osc_packet = [self.fx_names[fx], node, 1, group_id, 'bus', bus] + this_effect
             
-                msg.append(osc_packet)
-            
-                pkg.append(msg)
+                pkg.append(osc_packet)
 
         return pkg, node
 
     def get_synth_node(self, node, bus, group_id, synthdef, packet):
-        
-        msg = OSCMessage("/s_new")
 
         new_message = {}
 
@@ -402,9 +757,7 @@ class SCLangServerManager(ServerManager):
         osc_packet = [synthdef.name, node, 1, group_id, synthdef.bus_name, bus] \
             + self.create_osc_msg(new_message)
 
-        msg.append( osc_packet )
-
-        return msg, node
+        return osc_packet, node
 
     def get_pre_env_effect_nodes(self, node, bus, group_id, packet):
 
@@ -418,10 +771,8 @@ class SCLangServerManager(ServerManager):
 
                 # Get next node ID
                 node, last_node = self.nextnodeID(), node
-                msg = OSCMessage("/s_new")
                 osc_packet = [self.fx_names[fx], node, 1, group_id, 'bus', bus] + this_effect
-                msg.append( osc_packet )
-                pkg.append(msg)
+                pkg.append(osc_packet)
     
         return pkg, node
 
@@ -460,28 +811,24 @@ class SCLangServerManager(ServerManager):
             dest = "BasicEnvelope"
 
         node, last_node = self.nextnodeID(), node
-        msg = OSCMessage("/s_new")
         osc_packet = [dest, node, 1, group_id, 'bus', bus] + self.create_osc_msg(env_packet)
-        msg.append( osc_packet )
 
-        return msg, node
+        return osc_packet, node
 
-    def get_post_env_effect_nodes(self, node, bus, group_id, packet):
+    def get_post_env_effect_nodes(self, node, bus, group_id, packet, shared=()):
 
         pkg = []
 
         for fx in self.fxlist.order[2]:
 
-            if fx in packet and packet[fx] != 0:
+            if fx in packet and packet[fx] != 0 and fx not in shared:
 
                 this_effect = self.prepare_effect(fx, packet)
 
                 # Get next node ID
                 node, last_node = self.nextnodeID(), node
-                msg = OSCMessage("/s_new")
                 osc_packet = [self.fx_names[fx], node, 1, group_id, 'bus', bus] + this_effect
-                msg.append( osc_packet )
-                pkg.append(msg)
+                pkg.append(osc_packet)
 
         return pkg, node
 
@@ -496,15 +843,122 @@ class SCLangServerManager(ServerManager):
 
     def get_exit_node(self, node, bus, group_id, packet):
         
-        msg = OSCMessage("/s_new")
         node, last_node = self.nextnodeID(), node
         osc_packet = ['makeSound', node, 1, group_id, 'bus', bus, 'sus', float(packet["sus"])]
-        msg.append( osc_packet )
 
-        return msg, node
+        return osc_packet, node
+
+    def get_shared_exit_node(self, node, bus, group_id, packet, shared):
+
+        node, last_node = self.nextnodeID(), node
+        osc_packet = ['makeSharedSound', node, 1, group_id, 'bus', bus, 'out', shared.bus, 'sus', float(packet["sus"])]
+
+        return osc_packet, node
+
+    def get_shared_fx_group(self, key, packet, update=True):
+        """ Returns the shared effect group for `key` that has the effects used in `packet`, and
+            a list of messages that create it or update its arguments. Returns None if there are
+            no shared effects to use. Any old group with different effects is freed. If `update`
+            is False, messages are returned as None instead of creating or changing the group. """
 
-    def get_bundle(self, synthdef, packet, timestamp=0):
-        """ Returns the OSC Bundle for a notew based on a Player's SynthDef, and event and effects dictionaries """ 
+        effects = tuple(fx for fx in self.fxlist.shared() if packet.get(fx, 0) != 0)
+
+        shared = self.shared_fx.get(key, None)
+
+        if not update:
+
+            if len(effects) == 0:
+
+                return None, (None if shared is not None else [])
+
+            if shared is None or shared.effects != effects:
+
+                return None, None
+
+            if any(self.prepare_effect(fx, packet) != shared.args[fx] for fx in effects):
+
+                return None, None
+
+            return shared, []
+
+        if shared is not None and shared.effects != effects:
+
+            self.free_shared_fx(key)
+
+            shared = None
+
+        messages = []
+
+        if len(effects) == 0:
+
+            return None, messages
+
+        args = dict((fx, self.prepare_effect(fx, packet)) for fx in effects)
+
+        if shared is None:
+
+            group_id = self.nextnodeID()
+            bus = self.nextbusID()
+
+            messages.append(("/g_new", [group_id, 1, 1]))
+
+            nodes = {}
+
+            for fx in effects:
+
+                nodes[fx] = self.nextnodeID()
+
+                messages.append(("/s_new", [self.fx_names[fx], nodes[fx], 1, group_id, 'bus', bus] + args[fx]))
+
+            out = self.nextnodeID()
+
+            messages.append(("/s_new", ['playSharedSound', out, 1, group_id, 'bus', bus]))
+
+            shared = self.shared_fx[key] = SharedEffectGroup(group_id, bus, effects, nodes, args, out)
+
+        else:
+
+            # Only update the effects whose arguments have changed
+
+            for fx in effects:
+
+                if args[fx] != shared.args[fx]:
+
+                    messages.append(("/n_set", [shared.nodes[fx]] + args[fx]))
+
+                    shared.args[fx] = args[fx]
+
+        return shared, messages
+
+    def free_shared_fx(self, key):
+        """ Frees the shared effect group for `key` once the notes using it have ended """
+
+        shared = self.shared_fx.pop(key, None)
+
+        if shared is not None:
+
+            end_time = max(shared.end_time, time.time())
+
+            bundle = OSCBundle(time=end_time)
+
+            msg = OSCMessage("/n_free")
+
+            msg.append([shared.group])
+
+            bundle.append(msg)
+
+            self.sendOSC(bundle)
+
+            self.release_ids_at(end_time, shared.node_ids(), shared.bus)
+
+        return
+
+    def get_bundle(self, synthdef, packet, timestamp=0, shared_fx=None, prerender=False):
+        """ Returns the OSC Bundle for a notew based on a Player's SynthDef, and event and effects dictionaries.
+            If `shared_fx` is a key, post-envelope effects that don't depend on the note's length are
+            played by a group of effect nodes shared by all notes with that key (see `Player.share_effects`).
+            Bundles compiled ahead of time with `prerender` may be discarded, so the shared group is only
+            created or changed by bundles compiled on the beat, and None is returned if that is needed. """ 
 
         # Create a specific message for midi
 
@@ -512,20 +966,42 @@ class SCLangServerManager(ServerManager):
 
             return self.get_midi_message(synthdef, packet, timestamp)
 
-        # Create a bundle
-        
-        bundle = OSCBundle(time=timestamp)
-
         # Get the actual synthdef object
 
         synthdef = self.synthdefs[synthdef]
 
+        # Re-use the IDs of notes that have finished
+
+        self.release_ids()
+
+        # List of (address, arguments) for each message in the bundle
+
+        messages = []
+
+        shared = None
+
+        if shared_fx is not None:
+
+            shared, messages = self.get_shared_fx_group(shared_fx, packet, update=not prerender)
+
+            if messages is None:
+
+                return None
+
+        first_message = len(messages)
+
         # Create a group for the note
         group_id = self.nextnodeID()
-        msg = OSCMessage("/g_new")
-        msg.append( [group_id, 1, 1] )
-        
-        bundle.append(msg)
+
+        if shared is None:
+
+            messages.append(("/g_new", [group_id, 1, 1]))
+
+        else:
+
+            # Notes must be processed before the shared effect group
+
+            messages.append(("/g_new", [group_id, 2, shared.group]))
 
         # Get the bus and SynthDef nodes
         this_bus  = self.nextbusID()
@@ -535,53 +1011,106 @@ class SCLangServerManager(ServerManager):
 
         # First node of the group (control rate)
 
-        msg, this_node = self.get_init_node(this_node, this_bus, group_id, synthdef, packet)
+        osc_packet, this_node = self.get_init_node(this_node, this_bus, group_id, synthdef, packet)
 
-        # Add effects to control rate e.g. vibrato        
+        messages.append(("/s_new", osc_packet))
 
-        bundle.append( msg )
+        # Add effects to control rate e.g. vibrato        
 
         pkg, this_node = self.get_control_effect_nodes(this_node, this_bus, group_id, packet)
 
-        for msg in pkg:
-
-            bundle.append(msg)
+        messages.extend(("/s_new", osc_packet) for osc_packet in pkg)
 
         # trigger synth
 
-        msg, this_node = self.get_synth_node(this_node, this_bus, group_id, synthdef, packet)
+        osc_packet, this_node = self.get_synth_node(this_node, this_bus, group_id, synthdef, packet)
 
-        bundle.append(msg)
+        messages.append(("/s_new", osc_packet))
 
         # ORDER 1
 
         pkg, this_node = self.get_pre_env_effect_nodes(this_node, this_bus, group_id, packet)
 
-        for msg in pkg:
-
-            bundle.append(msg)
+        messages.extend(("/s_new", osc_packet) for osc_packet in pkg)
 
         # ENVELOPE
 
-        # msg, this_node = self.get_synth_envelope(this_node, this_bus, group_id, synthdef, packet)
+        # osc_packet, this_node = self.get_synth_envelope(this_node, this_bus, group_id, synthdef, packet)
 
-        # bundle.append( msg )
+        # messages.append(("/s_new", osc_packet))
 
         # ORDER 2 (AUDIO EFFECTS)
 
-        pkg, this_node = self.get_post_env_effect_nodes(this_node, this_bus, group_id, packet)
-    
-        for msg in pkg:
-    
-            bundle.append(msg)
+        if shared is None:
+
+            pkg, this_node = self.get_post_env_effect_nodes(this_node, this_bus, group_id, packet)
+
+        else:
+
+            pkg, this_node = self.get_post_env_effect_nodes(this_node, this_bus, group_id, packet, shared.effects)
+
+        messages.extend(("/s_new", osc_packet) for osc_packet in pkg)
 
         # OUT
 
-        msg, _ = self.get_exit_node(this_node, this_bus, group_id, packet)
+        if shared is None:
 
-        bundle.append(msg)
+            osc_packet, _ = self.get_exit_node(this_node, this_bus, group_id, packet)
 
-        return bundle        
+        else:
+
+            osc_packet, _ = self.get_shared_exit_node(this_node, this_bus, group_id, packet, shared)
+
+        messages.append(("/s_new", osc_packet))
+
+        # Release the IDs when makeSound has freed the group
+
+        end_time = (timestamp or time.time()) + float(packet["sus"]) * MAX_NOTE_DURATION + NOTE_RELEASE_TIME
+
+        nodes = [group_id] + [args[1] for address, args in messages[first_message:] if address == "/s_new"]
+
+        if shared is not None:
+
+            shared.end_time = max(shared.end_time, end_time)
+
+        self.release_ids_at(end_time, nodes, this_bus)
+
+        return self.compile_bundle(messages, timestamp)
+
+    def compile_bundle(self, messages, timestamp=0):
+        """ Returns an OSCBundle containing a list of (address, arguments) messages. If
+            `use_bundle_templates` is True, bundles with the same "shape" (addresses, strings
+            and argument types) are encoded by patching values into a cached template. """
+
+        if self.use_bundle_templates:
+
+            key = tuple((address, tuple(arg if type(arg) is str else type(arg) for arg in args)) for address, args in messages)
+
+            template = self.bundle_templates.get(key, None)
+
+            if template is None and BundleTemplate.supports(key):
+
+                if len(self.bundle_templates) >= self.max_bundle_templates:
+
+                    self.bundle_templates.clear()
+
+                template = self.bundle_templates[key] = BundleTemplate(key)
+
+            if template is not None:
+
+                return template.bundle(messages, timestamp)
+
+        bundle = OSCBundle(time=timestamp)
+
+        for address, args in messages:
+
+            msg = OSCMessage(address)
+
+            msg.append(args)
+
+            bundle.append(msg)
+
+        return bundle
 
     def send(self, address, message):
         """ Sends message (a list) to SuperCollider """
@@ -757,6 +1286,69 @@ class SCLangServerManager(ServerManager):
         self.forward = OSCClientWrapper()
         self.forward.connect( (addr, port) )
 
+class BundleTemplate(object):
+    """ Pre-packed binary of an OSC bundle's contents for a given "shape" of messages, i.e.
+        the same addresses, strings, and argument types. Only the int and float values
+        change between bundles, so these are packed into a copy of the template. """
+
+    packers = { int : struct.Struct(">i"), float : struct.Struct(">f") }
+    tags    = { int : "i", float : "f" }
+
+    def __init__(self, key):
+
+        data = bytearray()
+
+        self.slots = [] # (pack_into, offset) for each value
+
+        for address, args in key:
+
+            msg = bytearray(OSCString(address))
+
+            msg += OSCString("," + "".join("s" if type(arg) is str else self.tags[arg] for arg in args))
+
+            for arg in args:
+
+                if type(arg) is str:
+
+                    msg += OSCString(arg)
+
+                else:
+
+                    packer = self.packers[arg]
+
+                    # Offset includes the 4 byte size of the message
+
+                    self.slots.append((packer.pack_into, len(data) + 4 + len(msg)))
+
+                    msg += bytes(packer.size)
+
+            data += struct.pack(">i", len(msg)) + msg
+
+        self.data = bytes(data)
+        self.typetags = "," + ("b" * len(key))
+
+    @classmethod
+    def supports(cls, key):
+        """ Returns True if every argument is a string, int or float """
+        return all(type(arg) is str or arg in cls.packers for _, args in key for arg in args)
+
+    def bundle(self, messages, timestamp=0):
+        """ Returns an OSCBundle using the values from a list of (address, arguments) """
+
+        data = bytearray(self.data)
+
+        values = (arg for _, args in messages for arg in args if type(arg) is not str)
+
+        for (pack_into, offset), value in zip(self.slots, values):
+
+            pack_into(data, offset, value)
+
+        bundle = OSCBundle(time=timestamp)
+        bundle.message  = bytes(data)
+        bundle.typetags = self.typetags
+
+        return bundle
+
 try:
     
     import socketserver
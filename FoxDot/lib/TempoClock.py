@@ -11,8 +11,8 @@
     be activated. A queue block has a "beat" value for which its contents should be activated. To make
     sure that events happen on time, the `TempoClock` will begin processing the contents 0.25
     seconds before it is *actually* meant to happen in case there is a large amount to process.  When 
-    a queue block is activated, a new thread is created to process all of the callable objects it
-    contains. If it calls a `Player` object, the queue block keeps track of the OSC messages generated 
+    a queue block is activated, it is handed to a persistent worker thread (see `Clock.set_workers`)
+    that processes all of the callable objects it contains. If it calls a `Player` object, the queue block keeps track of the OSC messages generated 
     until all `Player` objects in the block have been called. At this point the thread is told to
     sleep until the remainder of the 0.25 seconds has passed. This value is stored in `Clock.latency`
     and is adjustable. If you find that there is a noticeable jitter between events, i.e. irregular
@@ -63,7 +63,14 @@ import time
 from fractions import Fraction
 from traceback import format_exc as error_stack
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 import sys
+import heapq
+import itertools
 import threading
 import inspect
 
@@ -132,6 +139,17 @@ class TempoClock(object):
         self.sleep_time = self.sleep_values[CPU_USAGE]
         self.midi_nudge = 0
 
+        # If True, sleep until the next event is due instead of polling every `sleep_time`
+        self.wake_on_deadline = False
+        self.max_sleep_time = 0.1 # Upper limit so tempo changes from other threads are noticed
+        self.now_lock = threading.Lock()
+
+        # Persistent worker threads that run activated queue blocks
+        self.executor = BlockExecutor(self.__run_block)
+
+        # Number of blocks that finished after their scheduled osc time
+        self.overruns = 0
+
         # Debug
         self.debugging = False
         self.__setup   = True
@@ -336,6 +354,19 @@ class TempoClock(object):
         self.sleep_time = self.sleep_values[value]
         return
 
+    def set_workers(self, n):
+        """ Sets the number of worker threads used to run queue blocks """
+        assert n > 0, "Clock needs at least one worker thread"
+        self.executor.resize(int(n))
+        return
+
+    def set_wake_on_deadline(self, on=True):
+        """ If `on` is True, the clock sleeps until the next scheduled block is due (or
+            until an earlier block is added) instead of polling every `sleep_time` seconds """
+        self.wake_on_deadline = bool(on)
+        self.queue.notify()
+        return
+
     def set_latency(self, value):
         """ Sets the `latency` attribute to values based on desired high/low/medium latency """
         assert 0 <= value <= 2
@@ -504,14 +535,15 @@ class TempoClock(object):
         if isinstance(self.bpm, (int, float)):
             self.beat = self.bpm_start_beat + self.get_elapsed_beats_from_last_bpm_change()
         else:
-            now = self.get_time()
-            self.beat += (now - self.last_now_call) * (self.get_bpm() / 60)
-            self.last_now_call = now
+            with self.now_lock:
+                now = self.get_time()
+                self.beat += (now - self.last_now_call) * (self.get_bpm() / 60)
+                self.last_now_call = now
         return self.beat
 
     def now(self):
         """ Returns the total elapsed time (in beats as opposed to seconds) """
-        if self.ticking is False: # Get the time w/o latency if not ticking
+        if self.ticking is False or self.wake_on_deadline: # Get the time w/o latency if not polling
             self.beat = self._now()
         return float(self.beat)
 
@@ -524,6 +556,11 @@ class TempoClock(object):
         """ Returns the true time that an osc message should be run i.e. now + latency """
         return time.time() + self.latency
         
+    def osc_message_time_at_beat(self, beat):
+        """ Returns the time that an osc message for an event at `beat` should be run i.e.
+            the machine time at `beat` + latency """
+        return self.get_time_at_beat(beat) - float(self.nudge) - float(self.hard_nudge) + self.latency
+
     def start(self):
         """ Starts the clock thread """ 
         self.thread.daemon = True
@@ -593,6 +630,18 @@ class TempoClock(object):
 
         block.send_osc_messages()
 
+        # Report if the messages were sent later than they were meant to be played
+
+        overrun = time.time() - block.time
+
+        if overrun > 0:
+
+            self.overruns += 1
+
+            if self.debugging:
+
+                print("Warning: block at beat {} overran its scheduled time by {:.4f}s".format(block.beat, overrun))
+
         # Store the osc messages -- future idea
 
         # self.history.add(block.beat, block.osc_messages)
@@ -614,11 +663,15 @@ class TempoClock(object):
 
                 self.current_block = self.queue.pop()
 
-                # Do the work in a thread
+                # Hand the work to a worker thread
 
                 if len(self.current_block):
 
-                    threading.Thread(target=self.__run_block, args=(self.current_block, beat)).start()
+                    self.executor.submit(self.current_block, beat)
+
+                # Check if any other blocks are due before sleeping
+
+                continue
 
             # If using a midi-clock, update the values
 
@@ -628,7 +681,11 @@ class TempoClock(object):
 
             # if using espgrid
 
-            if self.sleep_time > 0:
+            if self.wake_on_deadline:
+
+                self.queue.wait(self.max_sleep_time)
+
+            elif self.sleep_time > 0:
 
                 time.sleep(self.sleep_time)
 
@@ -690,7 +747,7 @@ class TempoClock(object):
 
     def next_event(self):
         """ Returns the beat index for the next event to be called """
-        return self.queue[-1][1]
+        return self.queue.next()
 
     def call(self, obj, dur, args=()):
         """ Returns a 'schedulable' wrapper for any callable object """
@@ -749,12 +806,31 @@ class TempoClock(object):
 #####
 
 class Queue(object):
+    """ Priority queue of `QueueBlock` instances keyed on beat. Blocks are stored
+        in a binary heap so that adding and popping is O(log n) in the number of
+        pending beats, and a dictionary maps each beat to its block so that events
+        scheduled for the same beat are merged into one block. """
     def __init__(self, parent):
-        self.data = []
+        self.data = [] # heap of (beat, order, block) tuples
+        self.blocks = {} # beat -> QueueBlock
         self.parent = parent
+        self.order = itertools.count()
+        self.lock = threading.RLock()
+        self.wakeup = threading.Condition(self.lock)
 
     def __repr__(self):
-        return "\n".join([str(item) for item in self.data]) if len(self.data) > 0 else "[]"
+        return "\n".join([str(item) for item in self.sorted_blocks(reverse=True)]) if len(self.data) > 0 else "[]"
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.sorted_blocks())
+
+    def sorted_blocks(self, reverse=False):
+        """ Returns a list of the queue blocks in order of beat """
+        with self.lock:
+            return [item[-1] for item in sorted(self.data, reverse=reverse)]
 
     def add(self, item, beat, args=(), kwargs={}, is_priority=False):
         """ Adds a callable object to the queue at a specified beat, args and kwargs for the
@@ -781,49 +857,29 @@ class Queue(object):
 
                     del kwargs[key]
 
-        # If the new event is before the next scheduled event,
-        # move it to the 'front' of the queue
-
-        if self.before_next_event(beat):
-
-            self.data.append(QueueBlock(self, item, beat, args, kwargs, is_priority))
+        with self.lock:
 
-            block = self.data[-1]
+            # If another event is happening at the same time, schedule together
 
-        else:
-
-            # If the event is after the next scheduled event, work
-            # out its position in the queue
-
-            # need to be careful in case self.data changes size
-            
-            for block in self.data:
-
-                # If another event is happening at the same time, schedule together
-
-                if beat == block.beat:
-
-                    block.add(item, args, kwargs, is_priority)
+            block = self.blocks.get(beat, None)
 
-                    break
+            if block is not None:
 
-                # If the event is later than the next event, schedule it here
+                block.add(item, args, kwargs, is_priority)
 
-                if beat > block.beat:
-
-                    try:
+            else:
 
-                        i = self.data.index(block)
+                block = QueueBlock(self, item, beat, args, kwargs, is_priority)
 
-                    except ValueError:
+                self.blocks[beat] = block
 
-                        i = 0
+                heapq.heappush(self.data, (beat, next(self.order), block))
 
-                    self.data.insert(i, QueueBlock(self, item, beat, args, kwargs, is_priority))
+                # Wake the clock if this is now the earliest block
 
-                    block = self.data[i]
+                if self.data[0][-1] is block:
 
-                    break
+                    self.wakeup.notify_all()
 
         # Tell any players about what queue item they are in
 
@@ -834,30 +890,54 @@ class Queue(object):
         return
 
     def clear(self):
-        while len(self.data):
-            del self.data[-1]
+        with self.lock:
+            del self.data[:]
+            self.blocks.clear()
+            self.wakeup.notify_all()
+        return
+
+    def notify(self):
+        """ Wakes any thread waiting in `Queue.wait` """
+        with self.lock:
+            self.wakeup.notify_all()
+        return
+
+    def wait(self, max_time):
+        """ Blocks until the next block is due, an earlier block is added, or
+            `max_time` seconds have passed """
+        with self.wakeup:
+            timeout = max_time
+            if len(self.data) > 0:
+                clock = self.parent
+                timeout = min(clock.get_time_at_beat(self.next()) - clock.get_time(), max_time)
+            if timeout > 0:
+                self.wakeup.wait(timeout)
         return
 
     def pop(self):
-        return self.data.pop() if len(self.data) > 0 else list()
+        with self.lock:
+            if len(self.data) > 0:
+                beat, _, block = heapq.heappop(self.data)
+                del self.blocks[beat]
+                return block
+        return list()
 
     def next(self):
-        if len(self.data) > 0:
-            try:
-                return self.data[-1].beat
-            except IndexError:
-                pass
+        try:
+            return self.data[0][0]
+        except IndexError:
+            pass
         return sys.maxsize
 
     def before_next_event(self, beat):
         try:
-            return beat < self.data[-1].beat
+            return beat < self.data[0][0]
         except IndexError:
             return True
 
     def after_next_event(self, beat):
         try:
-            return beat >= self.data[-1].beat
+            return beat >= self.data[0][0]
         except IndexError:
             return False
 
@@ -886,6 +966,10 @@ class QueueBlock(object):
 
         self.osc_messages   = []
 
+        # Number of datagrams and bytes used to send the osc messages
+        self.datagrams_sent = 0
+        self.bytes_sent     = 0
+
         self.parent = parent
         self.server = self.parent.get_server()
         self.metro  = self.parent.get_clock()
@@ -940,8 +1024,12 @@ class QueueBlock(object):
         return
 
     def send_osc_messages(self):
-        """ Sends all compiled osc messages to the SuperCollider server """
-        return list(map(self.server.sendOSC, self.osc_messages))
+        """ Sends all compiled osc messages to the SuperCollider server, combining them
+            into as few datagrams as possible """
+        sizes = self.server.sendOSCBundles(self.osc_messages)
+        self.datagrams_sent = len(sizes)
+        self.bytes_sent     = sum(sizes)
+        return sizes
 
     def players(self):
         return [item for level in self.events[1:3] for item in level]
@@ -983,6 +1071,67 @@ class QueueObj(object):
         self.called = True
         return value
 
+class BlockExecutor(object):
+    """ Pool of persistent threads that run activated `QueueBlock` instances so that
+        a new thread does not need to be created for every block. By default a single
+        dispatcher thread is used. Threads are started when the first block is submitted. """
+    def __init__(self, func, size=1):
+        self.func = func
+        self.size = size
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.started = False
+        self.running = 0  # Number of live worker threads
+        self.stopping = 0 # Number of workers that have been told to stop
+
+    def __len__(self):
+        return self.size
+
+    def resize(self, size):
+        """ Sets the number of worker threads """
+        with self.lock:
+            self.size = size
+            if self.started:
+                self._update_threads()
+        return
+
+    def _update_threads(self):
+        """ Starts or stops threads to match `self.size` """
+        active = self.running - self.stopping
+        for i in range(self.size - active):
+            thread = threading.Thread(target=self.work)
+            thread.daemon = True
+            thread.start()
+            self.running += 1
+        for i in range(active - self.size):
+            self.jobs.put(None) # Tells a worker to stop
+            self.stopping += 1
+        return
+
+    def submit(self, *args):
+        """ Adds a job to be run by the next free worker """
+        if not self.started:
+            with self.lock:
+                if not self.started:
+                    self._update_threads()
+                    self.started = True
+        self.jobs.put(args)
+        return
+
+    def work(self):
+        """ Worker thread loop """
+        while True:
+            args = self.jobs.get()
+            if args is None:
+                with self.lock:
+                    self.running -= 1
+                    self.stopping -= 1
+                return
+            try:
+                self.func(*args)
+            except:
+                print(error_stack())
+
 class History(object):
     """
     Stores osc messages send from the TempoClock so that if the
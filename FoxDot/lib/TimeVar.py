@@ -12,6 +12,7 @@ from .Utils  import *
 from .Patterns.Operations import *
 from .Constants import inf 
 
+from bisect import bisect_right
 from time import time
 
 def fetch(func):
@@ -25,12 +26,41 @@ def fetch(func):
     return eval_now
 
 
+def get_cumulative_durs(dur, index=0):
+    """ Returns a list of the times, from 0, at which each of the durations in one cycle
+        of the `dur` pattern end, starting at `index`. The list stops at the first `inf`
+        duration. Returns None if the durations can change or don't add up to more than 0. """
+    durs = dur.expand()
+    if not durs:
+        return None
+    for item in durs:
+        if not isinstance(item, type(inf)) and (type(item) not in (int, float) or item < 0):
+            return None
+    index = index % len(durs)
+    table = [0]
+    for item in durs[index:] + durs[:index]:
+        if isinstance(item, type(inf)):
+            table.append(inf)
+            break
+        table.append(table[-1] + item)
+    if table[-1] <= 0:
+        return None
+    return table
+
 class TimeVar(object):
     """ Var(values [,durs=[4]]) """
 
     metro = None
     depth = 128
 
+    next_time  = 0
+    next_index = 0
+
+    # Durations are looked up from (time, index), which moves when `update` changes them
+    dur_anchor = (0, 0)
+    # (dur, data, length, version, anchor index, cumulative durations) stored by get_dur_table()
+    dur_table  = None
+
     def __init__(self, values, dur=None, start=0, **kwargs):
 
         if dur is None:
@@ -139,10 +169,75 @@ class TimeVar(object):
 
             self.dur = asStream(dur)
 
+            self.set_dur_anchor()
+
         self.values = self.stream(values)
 
         return self
 
+    def set_dur_anchor(self):
+        """ New durations start at the end of the current value, as they did when the
+            index was only ever stepped forward """
+
+        if self.next_time == inf:
+
+            self.dur_anchor = (self.get_current_time() - self.start_time, self.next_index)
+
+        else:
+
+            self.dur_anchor = (self.next_time, self.next_index)
+
+        return
+
+    def get_dur_table(self):
+        """ Returns a list of the cumulative durations for one cycle of `dur`, starting
+            at the anchor's index, or None if the durations can change e.g. if they
+            contain a generator. Stored until `dur` is changed. """
+
+        dur, index = self.dur, self.dur_anchor[1]
+
+        if not isinstance(dur, metaPattern):
+
+            return None
+
+        data, table = dur.data, self.dur_table
+
+        if table is None or table[0] is not dur or table[1] is not data or table[2] != len(data) or table[3] != metaPattern.version or table[4] != index:
+
+            table = (dur, data, len(data), metaPattern.version, index, get_cumulative_durs(dur, index))
+
+            self.dur_table = table
+
+        return table[5]
+
+    def seek_current_index(self, time, table):
+        """ Sets the previous and next times, and the next index, for `time` using the
+            cumulative durations from `get_dur_table` """
+
+        anchor_time, anchor_index = self.dur_anchor
+
+        length, total = len(table) - 1, table[-1]
+
+        # A table ending in inf holds the last value so isn't repeated
+
+        if total == inf:
+
+            cycle, offset = 0, time - anchor_time
+
+        else:
+
+            cycle, offset = divmod(time - anchor_time, total)
+
+        i = max(min(bisect_right(table, offset), length) - 1, 0)
+
+        start = anchor_time + cycle * total if cycle else anchor_time
+
+        self.prev_time  = start + table[i]
+        self.next_time  = inf if table[i + 1] == inf else start + table[i + 1]
+        self.next_index = anchor_index + int(cycle) * length + i + 1
+
+        return
+
     def get_current_index(self, time=None):
         """ Returns the index of the value currently represented """
 
@@ -154,37 +249,58 @@ class TimeVar(object):
 
             return self.get_inf_index()
 
-        if time >= self.next_time:
+        # Durations that can't change are looked up in a table of cumulative durations
+        # so that the time can move backwards as well as forwards
+
+        if time < self.prev_time or time >= self.next_time:
 
-            while True:
+            table = self.get_dur_table()
 
-                next_dur = self.dur[self.next_index]
+            if table is not None and time >= 0:
 
-                self.next_time, self.prev_time = self.next_time + next_dur, self.next_time
+                self.seek_current_index(time, table)
 
-                # If we find an "inf"
+            elif table is not None:
 
-                if self.check_for_inf(next_dur):
+                self.next_time, self.prev_time, self.next_index = 0, 0, 0
 
-                    self.set_inf_index(self.next_index)
+            elif time >= self.next_time:
 
-                    return self.get_inf_index()
+                while True:
 
-                self.next_index += 1
+                    next_dur = self.dur[self.next_index]
 
-                if self.next_time >= time:
+                    self.next_time, self.prev_time = self.next_time + next_dur, self.next_time
 
-                    break
+                    # If we find an "inf"
+
+                    if self.check_for_inf(next_dur):
+
+                        self.set_inf_index(self.next_index)
+
+                        return self.get_inf_index()
+
+                    self.next_index += 1
+
+                    if self.next_time >= time:
+
+                        break
 
         # Store the % way through this value's time
 
-        try:
+        if self.next_time == inf:
+
+            self.proportion = 0
+
+        else:
+
+            try:
 
-            self.proportion = float((time - self.prev_time) / (self.next_time - self.prev_time))
+                self.proportion = float((time - self.prev_time) / (self.next_time - self.prev_time))
 
-        except ZeroDivisionError:
+            except ZeroDivisionError:
 
-            self.proportion = 1.0
+                self.proportion = 1.0
 
         # The current index is the next index minus one
 
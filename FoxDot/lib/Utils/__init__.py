@@ -12,6 +12,11 @@ import json
 import itertools
 from socket import timeout as socket_timeout
 
+try:
+    from math import gcd
+except ImportError:
+    from fractions import gcd
+
 try:
     from urllib.request import urlopen
     from urllib.error import URLError
@@ -57,6 +62,13 @@ def LCM(*args):
     elif len(args) == 1:
         return args[0]
 
+    # Positive whole numbers can use the greatest common divisor
+    if all(type(n) is int and n > 0 for n in args):
+        lcm = args[0]
+        for n in args[1:]:
+            lcm = lcm * n // gcd(lcm, n)
+        return lcm
+
     X = list(args)
 
     while any([X[0]!=K for K in X]):
@@ -0,0 +1,46 @@
+"""
+    Benchmark for the memory used by generator patterns over one million events,
+    comparing the bounded `GeneratorCache` with a dict that keeps every value.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_generator_memory
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import time
+import tracemalloc
+
+from FoxDot.lib.Patterns import PRand, PWhite, PWalk
+
+def get_patterns(bounded):
+    """ Returns a few generators, including ones derived using arithmetic """
+    rand = PRand([0, 1, 2, 3])
+    white = PWhite(0, 1)
+    walk = PWalk()
+    patterns = [rand, white, walk, (rand + 1) * 2, white * 0.5]
+    if not bounded:
+        for pattern in patterns + [p.parent for p in patterns[3:]]:
+            pattern.cache = {}
+    return patterns
+
+def run(n=1000000):
+    for bounded in (False, True):
+        tracemalloc.start()
+        patterns = get_patterns(bounded)
+        start = time.perf_counter()
+        for i in range(n):
+            for pattern in patterns:
+                pattern[i]
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        label = "bounded" if bounded else "dict"
+        print("{:>8}: {:.1f}MB after {} events ({:.2f}us per event)".format(
+            label, current / 1e6, n, 1e6 * elapsed / n))
+        del patterns
+    return
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,53 @@
+"""
+    Benchmark for `SCLangServerManager.get_bundle`, comparing bundles encoded
+    from cached templates with bundles built one `OSCMessage.append` at a time,
+    and counting the nodes each note uses with and without a shared effect group.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_get_bundle
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import time
+
+from FoxDot.lib import Server, Player, SynthDefs
+
+def get_packet():
+    """ Returns a message dict for a note with a few effects """
+    player = Player("bench")
+    player >> SynthDefs["pluck"]([0, 2, 4], room=0.5, mix=0.3, hpf=200, vib=4)
+    player.get_event()
+    packet = player.new_message_header(dict(player.event))
+    player.stop()
+    return packet
+
+def run(n=20000):
+    packet = get_packet()
+    for use_templates in (False, True):
+        Server.use_bundle_templates = use_templates
+        start = time.perf_counter()
+        for i in range(n):
+            Server.get_bundle("pluck", dict(packet), timestamp=time.time())
+        elapsed = time.perf_counter() - start
+        label = "template" if use_templates else "OSCMessage"
+        print("{:>10}: {:.3f}s ({:.2f}us per bundle)".format(label, elapsed, 1e6 * elapsed / n))
+    count_nodes(packet)
+    return
+
+def count_nodes(packet, n=100):
+    """ Prints the number of server nodes used by `n` notes with and without a shared effect group """
+    for shared_fx in (None, "bench"):
+        Server.release_ids(float("inf"))
+        before = Server.get_id_stats()["nodes"]
+        for i in range(n):
+            Server.get_bundle("pluck", dict(packet), timestamp=time.time() + 1000, shared_fx=shared_fx)
+        label = "shared" if shared_fx else "per note"
+        print("{:>10}: {} nodes for {} notes".format(label, Server.get_id_stats()["nodes"] - before, n))
+    Server.free_shared_fx("bench")
+    Server.release_ids(float("inf"))
+    return
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,49 @@
+"""
+    Benchmark for `Player.get_event` with at least 40 attributes, most of which
+    are constant, comparing it with calculating every attribute for each event.
+    A player's default attributes count towards the 40.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_get_event
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import time
+
+from FoxDot.lib import Player, SynthDefs, var
+
+def get_player(n_attrs=40):
+    """ Returns a player with at least `n_attrs` attributes: a few patterns, a TimeVar, and constants """
+    player = Player("bench")
+    player >> SynthDefs["pluck"]([0, 1, 2, 3], dur=[1, 1/2, 1/2], amp=[1, 0.5], pan=var([-1, 1]))
+    n = 0
+    while len(player.attr) < n_attrs:
+        setattr(player, "bench{}".format(n), 0.5)
+        n += 1
+    return player
+
+def calculate_all(player):
+    """ Calculates every attribute, as `get_event` did before attributes were classified """
+    event = dict(map(lambda attr: (attr, player.now(attr)), player.attr.keys()))
+    event = player.unduplicate_durs(event)
+    event = player.get_prime_funcs(event)
+    player.event = event
+    player.update_all_player_keys()
+
+def run(n=20000):
+    player = get_player()
+    print("{} attributes, {} not constant".format(len(player.attr), len(player.classify_attrs()[1])))
+    for label, func in (("all", calculate_all), ("classified", type(player).get_event)):
+        start = time.perf_counter()
+        for i in range(n):
+            player.event_n = i
+            func(player)
+        elapsed = time.perf_counter() - start
+        print("{:>10}: {:.3f}s ({:.2f}us per event)".format(label, elapsed, 1e6 * elapsed / n))
+    player.stop()
+    return
+
+if __name__ == "__main__":
+    run()
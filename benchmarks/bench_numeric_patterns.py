@@ -0,0 +1,57 @@
+"""
+    Benchmark for arithmetic, `len` and reordering methods on large patterns that
+    only contain ints and floats, comparing the numeric paths with calculating
+    each value separately.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_numeric_patterns
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import time
+
+from FoxDot.lib.Patterns import PRange, PSine, PEuclid, Pattern
+from FoxDot.lib.Patterns import Operations
+
+def get_patterns(size=10000):
+    """ Returns a few generated patterns with `size` steps """
+    return [PRange(size), PSine(size), PEuclid(size // 2, size), PRange(size) * 0.25]
+
+def calculate(patterns):
+    """ Runs the operations and methods on each pattern """
+    for pat in patterns:
+        (pat + 1) * 2 - pat / 3
+        pat % 7 + 2 ** (pat % 3)
+        pat.reverse().rotate(3).mirror().stretch(len(pat) + 5)
+        for i in range(100):
+            len(pat)
+
+def each_value(patterns):
+    """ As `calculate` but without the numeric paths """
+    numeric = Pattern.is_numeric
+    operands = [op for op in vars(Operations).values() if isinstance(op, Operations.POperand)]
+    fast = [op.fast_operate for op in operands]
+    try:
+        Pattern.is_numeric = lambda self: False
+        for op in operands:
+            op.fast_operate = None
+        calculate(patterns)
+    finally:
+        Pattern.is_numeric = numeric
+        for op, func in zip(operands, fast):
+            op.fast_operate = func
+
+def run(n=20, size=10000):
+    patterns = get_patterns(size)
+    for label, func in (("each value", each_value), ("numeric", calculate)):
+        start = time.perf_counter()
+        for i in range(n):
+            func(patterns)
+        elapsed = time.perf_counter() - start
+        print("{:>10}: {:.3f}s ({:.2f}ms per run)".format(label, elapsed, 1e3 * elapsed / n))
+    return
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,36 @@
+"""
+    Benchmark for decoding incoming OSC packets, comparing `decodeOSC`, which
+    copies the rest of the packet after reading each value, with
+    `decodeOSCBuffer`, which reads values in place.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_osc_decode
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import time
+
+from FoxDot.lib.OSC3 import decodeOSC, decodeOSCBuffer, encodeOSC, encodeOSCBundle
+
+def get_packets():
+    """ Returns a short reply, a long message, and a bundle of tempo messages """
+    status = encodeOSC("/status.reply", [1, 0, 0, 2, 10, 0.5, 0.5, 44100.0, 44099.9])
+    values = encodeOSC("/b_setn", [1, 0, 1000] + [i / 7.0 for i in range(1000)])
+    bundle = encodeOSCBundle(time.time(), [("/esp/tempo/r", [1, 120.0, i, 100, 8]) for i in range(100)])
+    return [("status", status), ("1000 floats", values), ("bundle of 100", bundle)]
+
+def run(n=2000):
+    for label, packet in get_packets():
+        assert decodeOSC(packet) == decodeOSCBuffer(packet)
+        for name, func in (("decodeOSC", decodeOSC), ("in place", decodeOSCBuffer)):
+            start = time.perf_counter()
+            for i in range(n):
+                func(packet)
+            elapsed = time.perf_counter() - start
+            print("{:>14} {:>10}: {:.3f}s ({:.2f}us per packet)".format(label, name, elapsed, 1e6 * elapsed / n))
+    return
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,65 @@
+"""
+    Benchmark for encoding an OSC bundle for a note, comparing `OSCBundle.getBinary`
+    with messages built one argument at a time, messages built by appending a list
+    of arguments, and `encodeOSCBundle`.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_osc_encode
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import time
+
+from FoxDot.lib.OSC3 import OSCMessage, OSCBundle, encodeOSCBundle
+
+def get_messages():
+    """ Returns the (address, arguments) of the messages for a note with a few effects """
+    bus, group = 4, 1000
+    return [
+        ("/g_new", [group, 1, 1]),
+        ("/s_new", ["startSound", group + 1, 1, group, "bus", bus, "rate", 1.0, "sus", 0.5]),
+        ("/s_new", ["vibrato", group + 2, 1, group, "bus", bus, "vib", 4.0, "vibdepth", 0.02]),
+        ("/s_new", ["pluck", group + 3, 1, group, "bus", bus, "freq", 261.63, "amp", 0.5, "sus", 0.5,
+                    "pan", 0.0, "blur", 1.0, "rate", 0.0, "fmod", 0.0, "beat_dur", 0.5]),
+        ("/s_new", ["highPassFilter", group + 4, 1, group, "bus", bus, "hpf", 200.0, "hpr", 1.0]),
+        ("/s_new", ["reverb", group + 5, 1, group, "bus", bus, "room", 0.5, "mix", 0.3]),
+        ("/s_new", ["makeSound", group + 6, 1, group, "bus", bus, "sus", 0.5]),
+    ]
+
+def per_value(messages, timestamp):
+    bundle = OSCBundle(time=timestamp)
+    for address, args in messages:
+        msg = OSCMessage(address)
+        for arg in args:
+            msg.append(arg)
+        bundle.append(msg)
+    return bundle.getBinary()
+
+def per_message(messages, timestamp):
+    bundle = OSCBundle(time=timestamp)
+    for address, args in messages:
+        msg = OSCMessage(address)
+        msg.append(args)
+        bundle.append(msg)
+    return bundle.getBinary()
+
+def encoder(messages, timestamp):
+    return encodeOSCBundle(timestamp, messages)
+
+def run(n=20000):
+    messages = get_messages()
+    timestamp = time.time()
+    expected = per_value(messages, timestamp)
+    for label, func in (("per value", per_value), ("OSCMessage", per_message), ("encoder", encoder)):
+        assert func(messages, timestamp) == expected
+        start = time.perf_counter()
+        for i in range(n):
+            func(messages, timestamp)
+        elapsed = time.perf_counter() - start
+        print("{:>10}: {:.3f}s ({:.2f}us per bundle)".format(label, elapsed, 1e6 * elapsed / n))
+    return
+
+if __name__ == "__main__":
+    run()
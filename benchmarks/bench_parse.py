@@ -0,0 +1,39 @@
+"""
+    Benchmark for parsing long play strings with deeply nested `()[]{}<>` brackets.
+    Times parsing the string into nodes, creating the pattern data with the string
+    parsed each time, and creating the pattern data using the parsed string cache.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_parse
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import time
+
+from FoxDot.lib.Patterns.Parse import ParsePlayString, parse_play_string, play_string_cache
+
+def get_string(size=1000):
+    """ Returns a play string of at least `size` characters """
+    block = "x-o-[--](-[o(*=)]<a{bc}>)|x2|{xo[--]}<(x-)(o[-*])><-=>"
+    return block * (size // len(block) + 1)
+
+def uncached(string):
+    play_string_cache.clear()
+    return ParsePlayString(string)
+
+def run(n=200):
+    for size in (1000, 5000):
+        string = get_string(size)
+        print("{} characters".format(len(string)))
+        for label, func in (("nodes", parse_play_string), ("uncached", uncached), ("cached", ParsePlayString)):
+            start = time.perf_counter()
+            for i in range(n):
+                func(string)
+            elapsed = time.perf_counter() - start
+            print("{:>8}: {:.3f}s ({:.2f}ms per string)".format(label, elapsed, 1e3 * elapsed / n))
+    return
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,43 @@
+"""
+    Benchmark for `TempoClock.Queue` scheduling. Adds 100,000 events at
+    random beats (with some sharing the same beat) then pops every block.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_queue
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import random
+import time
+
+from FoxDot.lib.TempoClock import TempoClock, Queue
+
+def event():
+    return
+
+def run(n=100000, seed=0):
+    random.seed(seed)
+    queue = Queue(TempoClock())
+    beats = [random.randint(0, n // 4) * 0.25 for i in range(n)]
+
+    start = time.perf_counter()
+    for beat in beats:
+        queue.add(event, beat)
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blocks = 0
+    while len(queue):
+        queue.pop()
+        blocks += 1
+    pop_time = time.perf_counter() - start
+
+    print("Scheduled {} events into {} blocks".format(n, blocks))
+    print("add: {:.3f}s ({:.2f}us per event)".format(add_time, 1e6 * add_time / n))
+    print("pop: {:.3f}s ({:.2f}us per block)".format(pop_time, 1e6 * pop_time / blocks))
+    return
+
+if __name__ == "__main__":
+    run()
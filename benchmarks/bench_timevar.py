@@ -0,0 +1,67 @@
+"""
+    Benchmark for evaluating many TimeVars at arbitrary times, e.g. when looking ahead
+    to schedule events, comparing stepping through each duration with looking up the
+    time in a table of cumulative durations.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_timevar
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import random
+import time
+
+from FoxDot.lib import var, linvar
+from FoxDot.lib.TimeVar import TimeVar
+
+def get_vars(n=100):
+    """ Returns `n` TimeVars with 16 durations each """
+    durs = [[random.choice([0.25, 0.5, 1, 2]) for i in range(16)] for j in range(n)]
+    return [(var if i % 2 else linvar)(list(range(16)), durs[i]) for i in range(n)]
+
+def get_times(n=200):
+    """ Returns times that move forwards by a bar and back by a few beats """
+    times, beat = [], 0
+    for i in range(n):
+        beat += 4
+        times.append(beat)
+        times.append(beat - random.choice([1, 2, 3]))
+    return times
+
+def evaluate(timevars, times):
+    for beat in times:
+        for timevar in timevars:
+            timevar.now(beat)
+
+def stepped(timevars, times):
+    """ As `evaluate` but stepping through each duration, which can't move backwards """
+    get_dur_table = TimeVar.get_dur_table
+    try:
+        TimeVar.get_dur_table = lambda self: None
+        for timevar in timevars:
+            timevar.next_time, timevar.prev_time, timevar.next_index = 0, 0, 0
+        evaluate(timevars, times)
+    finally:
+        TimeVar.get_dur_table = get_dur_table
+
+def run():
+    random.seed(0)
+    timevars, times = get_vars(), get_times()
+    for label, func in (("stepped", stepped), ("table", evaluate)):
+        start = time.perf_counter()
+        func(timevars, times)
+        elapsed = time.perf_counter() - start
+        calls = len(timevars) * len(times)
+        print("{:>8}: {:.3f}s ({:.2f}us per call)".format(label, elapsed, 1e6 * elapsed / calls))
+    # Jump far ahead
+    for label, func in (("stepped", stepped), ("table", evaluate)):
+        start = time.perf_counter()
+        func(timevars, [10000, 20000])
+        elapsed = time.perf_counter() - start
+        print("{:>8}: {:.3f}s to jump 20000 beats ahead".format(label, elapsed))
+    return
+
+if __name__ == "__main__":
+    run()
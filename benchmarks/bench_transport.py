@@ -0,0 +1,63 @@
+"""
+    Benchmark for the whole path from a Player's event to the datagrams sent to
+    the server, using the "null" transport so that no SuperCollider server is
+    needed. Prints the number of notes compiled and sent per second.
+
+    Run from the repository root:
+
+        python -m benchmarks.bench_transport
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import time
+
+from FoxDot.lib import Server, Player, SynthDefs, var
+
+def get_players():
+    """ Returns a few players playing chords, samples and effects """
+    players = [Player("bench{}".format(i)) for i in range(4)]
+    players[0] >> SynthDefs["pluck"]([0, 1, 2, 3], dur=1/4, room=0.5)
+    players[1] >> SynthDefs["pads"]([(0, 2, 4), (1, 3, 5)], dur=2, lpf=var([500, 2000]))
+    players[2] >> SynthDefs["bass"]([0, 0, 4, 3], dur=1/2, amp=[1, 0.5])
+    players[3] >> SynthDefs["blip"]([0, 2, [4, 7]], dur=1/4, hpf=200, pan=[-1, 1])
+    return players
+
+def send_blocks(players, n):
+    """ Sends `n` blocks of events, as the clock would, and returns the number of notes """
+    notes = 0
+    for i in range(n):
+        bundles = []
+        timestamp = time.time() + 1
+        for player in players:
+            player.event_n = i
+            player.get_event()
+            for j in range(player.get_event_length()):
+                player.send_osc_message(player.event, j, timestamp=timestamp, bundles=bundles)
+        Server.sendOSCBundles(bundles)
+        notes += len(bundles)
+    return notes
+
+def run(n=2000):
+    players = get_players()
+    transport = Server.transport
+    try:
+        for decode in (False, True):
+            client = Server.setTransport("null")
+            client.decode = decode
+            start = time.perf_counter()
+            notes = send_blocks(players, n)
+            elapsed = time.perf_counter() - start
+            stats = client.get_stats()
+            label = "decoded" if decode else "counted"
+            print("{:>8}: {} notes in {} datagrams ({} bytes), {:.0f} notes per second".format(
+                label, notes, stats["datagrams"], stats["bytes"], notes / elapsed))
+            Server.release_ids(float("inf"))
+    finally:
+        Server.setTransport(transport)
+        for player in players:
+            player.stop()
+    return
+
+if __name__ == "__main__":
+    run()
@@ -3,9 +3,36 @@ import os
 import shutil
 import tempfile
 import unittest
+import wave
+from contextlib import closing
 from os.path import join
 
-from FoxDot.lib.Buffers import BufferManager
+from FoxDot.lib.Buffers import BufferManager, symbolToDir
+
+
+def write_wav(path, channels=1, frames=10):
+    """ Writes a silent 16-bit wav file """
+    with closing(wave.open(path, 'wb')) as snd:
+        snd.setnchannels(channels)
+        snd.setsampwidth(2)
+        snd.setframerate(44100)
+        snd.writeframes(b'\x00\x00' * channels * frames)
+    return path
+
+
+class FakeServer(object):
+
+    """ Records buffer messages instead of sending them to SuperCollider """
+    max_buffers = 32
+
+    def __init__(self):
+        self.messages = []
+
+    def bufferRead(self, path, bufnum):
+        self.messages.append(("read", path, bufnum))
+
+    def bufferFree(self, bufnum):
+        self.messages.append(("free", bufnum))
 
 
 class TestSampleSearch(unittest.TestCase):
@@ -107,3 +134,184 @@ class TestSampleSearch(unittest.TestCase):
         sample = '**/house/*'
         found = self.bm._findSample(sample)
         self.assertEqual(found, self._housekick)
+
+    def test_index_rescan(self):
+        """ New files are found by pattern searches after a rescan """
+        self.assertEqual(self.bm._findSample('snare*', 2), self._snare1)
+        snare3 = join(self.wd, 'snares', 'snare3.wav')
+        open(snare3, 'w').close()
+        self.assertEqual(self.bm._findSample('snare*', 2), self._snare1)
+        self.bm.rescan()
+        self.assertEqual(self.bm._findSample('snare*', 2), snare3)
+
+    def test_index_file(self):
+        """ The index is saved and only changed directories are read again """
+        handle, index_file = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        os.remove(index_file)
+        self.addCleanup(os.remove, index_file)
+        self.bm.setIndexFile(index_file)
+        self.assertEqual(self.bm._findSample('**/house/*'), self._housekick)
+        self.assertTrue(os.path.isfile(index_file))
+        bm = BufferManager()
+        bm._paths = [self.wd]
+        listdir = os.listdir
+        read = []
+        def record(path):
+            read.append(path)
+            return listdir(path)
+        os.listdir = record
+        try:
+            bm.setIndexFile(index_file)
+            self.assertEqual(bm._findSample('k?c*/*'), self._808)
+            self.assertEqual(read, [])
+            os.remove(self._808)
+            bm.rescan()
+            self.assertEqual(read, [join(self.wd, 'kicks')])
+            self.assertEqual(bm._findSample('k?c*/*'), self._kick)
+        finally:
+            os.listdir = listdir
+
+
+class TestSymbolCache(unittest.TestCase):
+
+    """ Test that repeated symbol lookups don't search the disk """
+    def setUp(self):
+        super(TestSymbolCache, self).setUp()
+        self.wd = tempfile.mkdtemp()
+        self._root = symbolToDir.root
+        os.makedirs(join(self.wd, 'x', 'lower'))
+        for name in ('kick1.wav', 'kick2.wav'):
+            write_wav(join(self.wd, 'x', 'lower', name))
+        open(join(self.wd, 'x', 'lower', 'notes.txt'), 'w').close()
+        symbolToDir.set_root(self.wd)
+        self.server = FakeServer()
+        self.bm = BufferManager(server=self.server)
+        self._listdir = os.listdir
+
+    def tearDown(self):
+        super(TestSymbolCache, self).tearDown()
+        os.listdir = self._listdir
+        symbolToDir.set_root(self._root)
+        shutil.rmtree(self.wd)
+
+    def no_disk(self, *args, **kwargs):
+        raise AssertionError("Disk accessed")
+
+    def test_symbol_cached(self):
+        """ Second lookup of a symbol uses the stored buffer """
+        buf = self.bm.getBufferFromSymbol('x', 1)
+        self.assertTrue(buf.fn.endswith('kick2.wav'))
+        os.listdir = self.no_disk
+        self.assertIs(self.bm.getBufferFromSymbol('x', 1), buf)
+        self.assertEqual(len(self.server.messages), 1)
+
+    def test_dir_listed_once(self):
+        """ Other samples in the same directory don't list it again """
+        self.bm.getBufferFromSymbol('x', 0)
+        os.listdir = self.no_disk
+        self.assertTrue(self.bm.getBufferFromSymbol('x', 3).fn.endswith('kick2.wav'))
+
+    def test_invalidated(self):
+        """ New files are found after a rescan, addPath, or free """
+        buf = self.bm.getBufferFromSymbol('x', 2)
+        self.assertTrue(buf.fn.endswith('kick1.wav'))
+        write_wav(join(self.wd, 'x', 'lower', 'kick3.wav'))
+        self.assertIs(self.bm.getBufferFromSymbol('x', 2), buf)
+        self.bm.rescan()
+        self.assertTrue(self.bm.getBufferFromSymbol('x', 2).fn.endswith('kick3.wav'))
+        self.bm.free(self.bm.getBufferFromSymbol('x', 2).bufnum)
+        self.assertNotIn(('x', 2), self.bm._symbol_to_buf)
+        self.bm.getBufferFromSymbol('x', 2)
+        self.bm.addPath(self.wd)
+        self.assertEqual(self.bm._symbol_to_buf, {})
+
+    def test_preload(self):
+        """ Preloaded samples are loaded in the background and then stored """
+        self.bm.preload("x x.", indices=range(2))
+        self.bm.waitForPreload()
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertIn(('x', 0), self.bm._symbol_to_buf)
+        os.listdir = self.no_disk
+        self.assertTrue(self.bm.getBufferFromSymbol('x', 1).fn.endswith('kick2.wav'))
+
+
+class TestEviction(unittest.TestCase):
+
+    """ Test freeing the least recently used buffers when the buffers are full """
+    def setUp(self):
+        super(TestEviction, self).setUp()
+        self.wd = tempfile.mkdtemp()
+        self.server = FakeServer()
+        self.server.max_buffers = 4
+        self.bm = BufferManager(server=self.server)
+        self.files = [write_wav(join(self.wd, 'sample{}.wav'.format(i))) for i in range(5)]
+
+    def tearDown(self):
+        super(TestEviction, self).tearDown()
+        shutil.rmtree(self.wd)
+
+    def test_full(self):
+        """ Without eviction a full buffer table raises an error """
+        for fn in self.files[:3]:
+            self.bm.loadBuffer(fn)
+        self.assertRaises(RuntimeError, self.bm.loadBuffer, self.files[3])
+
+    def test_evict_least_recent(self):
+        """ The least recently used buffer is freed """
+        self.bm.setEviction(True)
+        bufnums = [self.bm.loadBuffer(fn) for fn in self.files[:3]]
+        self.bm.loadBuffer(self.files[0])
+        self.assertEqual(self.bm.loadBuffer(self.files[3]), bufnums[1])
+        self.assertIn(("free", bufnums[1]), self.server.messages)
+        self.assertNotIn(self.files[1], self.bm._fn_to_buf)
+
+    def test_in_use_not_evicted(self):
+        """ Buffers being used by playing players are not freed """
+        self.bm.setEviction(True)
+        bufnums = [self.bm.loadBuffer(fn) for fn in self.files[:3]]
+        self.bm.setInUse(lambda: bufnums[:2])
+        self.assertEqual(self.bm.loadBuffer(self.files[3]), bufnums[2])
+        self.bm.setInUse(lambda: bufnums)
+        self.assertRaises(RuntimeError, self.bm.loadBuffer, self.files[4])
+
+
+class TestSoundInfoCache(unittest.TestCase):
+
+    """ Test the stored channels, frames, and rate of sample files """
+    def setUp(self):
+        super(TestSoundInfoCache, self).setUp()
+        self.wd = tempfile.mkdtemp()
+        self.info_file = join(self.wd, 'info.json')
+        self.sample = write_wav(join(self.wd, 'sample.wav'), channels=2, frames=20)
+        self._open = wave.open
+
+    def tearDown(self):
+        super(TestSoundInfoCache, self).tearDown()
+        wave.open = self._open
+        shutil.rmtree(self.wd)
+
+    def load(self):
+        bm = BufferManager(server=FakeServer())
+        bm.setSoundInfoFile(self.info_file)
+        buf = bm.getBuffer(bm.loadBuffer(self.sample))
+        bm._sound_info.save()
+        return buf
+
+    def no_read(self, *args, **kwargs):
+        raise AssertionError("Audio file opened")
+
+    def test_info_saved(self):
+        """ Info is read from the file the first time only """
+        buf = self.load()
+        self.assertEqual((buf.channels, buf.frames, buf.rate), (2, 20, 44100))
+        wave.open = self.no_read
+        buf = self.load()
+        self.assertEqual((buf.channels, buf.frames, buf.rate), (2, 20, 44100))
+
+    def test_changed_file(self):
+        """ Files are read again if their size or modification time changes """
+        self.load()
+        write_wav(self.sample, channels=1, frames=40)
+        buf = self.load()
+        self.assertEqual((buf.channels, buf.frames), (1, 40))
@@ -1,7 +1,7 @@
 import unittest
 
-from FoxDot.lib.Patterns import GeneratorPattern
-from FoxDot.lib.Patterns import P
+from FoxDot.lib.Patterns import GeneratorPattern, GeneratorCache
+from FoxDot.lib.Patterns import P, PRand, PWhite
 
 class TestPatternMethods(unittest.TestCase):
     def test_from_func(self):
@@ -14,6 +14,34 @@ class TestPatternMethods(unittest.TestCase):
         self.assertTrue(isinstance(pattern, GeneratorPattern))
         self.assertEqual(pattern[:4], P[1, 1, 1, 2])
 
+    def test_cache_bounded(self):
+        """ Only the most recent values are kept, and are returned again """
+        pattern = PWhite(0, 1).set_cache_size(64)
+        values = [pattern[i] for i in range(1000)]
+        self.assertEqual(len(pattern.cache), 64)
+        self.assertEqual([pattern[i] for i in range(936, 1000)], values[936:])
+        self.assertNotIn(0, pattern.cache)
+
+    def test_derived_cache(self):
+        """ Generators created with arithmetic have bounded caches and match the original """
+        pattern = PRand(100).set_cache_size(32)
+        derived = (pattern + 1) * 2
+        values = [derived[i] for i in range(500)]
+        self.assertEqual(values[-32:], [(pattern[i] + 1) * 2 for i in range(468, 500)])
+        self.assertEqual(derived.cache.size, 32)
+        self.assertEqual(len(derived.parent.cache), 32)
+
+    def test_resize(self):
+        """ Resizing keeps the most recent values """
+        cache = GeneratorCache(8)
+        for i in range(20):
+            cache[i] = i * 2
+        cache.resize(4)
+        self.assertEqual(sorted(cache.items()), [(16, 32), (17, 34), (18, 36), (19, 38)])
+        self.assertEqual(cache.get(15, "missing"), "missing")
+        with self.assertRaises(KeyError):
+            cache[3]
+
 
 if __name__ == "__main__":
 
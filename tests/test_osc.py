@@ -0,0 +1,103 @@
+""" Tests for OSC3 """
+import socket
+import time
+import unittest
+
+from FoxDot.lib.OSC3 import OSCMessage, OSCBundle, OSCArgument, decodeOSC, decodeOSCBuffer, encodeOSC, encodeOSCBundle
+from FoxDot.lib.ServerManager import BidirectionalOSCServer
+
+
+ARGS = ["pluck", 1001, 1, 1, "bus", 4, "freq", 261.6, "amp", 0.5, "sustain", "ab"]
+
+
+def slow_message(address, args):
+    """ Returns an OSCMessage with each argument appended one at a time """
+    msg = OSCMessage(address)
+    for arg in args:
+        msg.append(arg)
+    return msg
+
+
+class TestEncoder(unittest.TestCase):
+
+    """ Test the fast encoder gives the same binary as appending each argument """
+    def test_message(self):
+        """ Messages are the same as before """
+        for args in (ARGS, [], ["a" * 8, -1, 1e-9, "é"], [[1, 2.0], {"amp": 1.5}, ("x", 3)]):
+            expected = slow_message("/s_new", args).getBinary()
+            self.assertEqual(encodeOSC("/s_new", args), expected)
+            msg = OSCMessage("/s_new")
+            msg.append(args)
+            self.assertEqual(msg.getBinary(), expected)
+
+    def test_bundle(self):
+        """ Bundles, including nested bundles, are the same as before """
+        now = time.time()
+        inner = OSCBundle(time=now)
+        inner.append(slow_message("/s_new", ARGS))
+        inner.append(slow_message("/g_new", [1002, 1, 1]))
+        outer = OSCBundle(time=now + 1)
+        outer.append(inner)
+        outer.append(slow_message("/n_free", [1002]))
+        binary = encodeOSCBundle(now + 1, [(now, [("/s_new", ARGS), ("/g_new", [1002, 1, 1])]), ("/n_free", [1002])])
+        self.assertEqual(binary, outer.getBinary())
+        self.assertEqual(encodeOSCBundle(now + 1, [inner, inner.getBinary()]), encodeOSCBundle(now + 1, [inner, inner]))
+
+    def test_blob(self):
+        """ Blobs are padded and prefixed with their size """
+        binary = encodeOSC("/b_setn", [b"abcde", 1])
+        self.assertEqual(len(binary) % 4, 0)
+        self.assertEqual(decodeOSC(binary), ["/b_setn", ",bi", b"abcde", 1])
+
+    def test_unsupported(self):
+        """ Other types are encoded by OSCArgument, and messages can't be arguments """
+        class Name(str):
+            pass
+        self.assertEqual(encodeOSC("/x", [Name("pluck")]), encodeOSC("/x", ["pluck"]))
+        self.assertEqual(OSCArgument(Name("pluck")), OSCArgument("pluck"))
+        with self.assertRaises(TypeError):
+            encodeOSC("/x", [OSCMessage("/y")])
+
+
+class TestDecoder(unittest.TestCase):
+
+    """ Test decoding in place gives the same values as decodeOSC """
+    def get_packets(self):
+        msg = slow_message("/status.reply", [1, 0, 0, 2, 10, 0.5, 0.5, 44100.0, 44099.9])
+        long_msg = slow_message("/b_setn", [1, 0, 500] + [i / 7.0 for i in range(500)])
+        blobs = slow_message("/blob", [1])
+        blobs.append(b"abcdef", "b")
+        blobs.append(0.25, "d")
+        bundle = OSCBundle(time=time.time())
+        for item in (msg, blobs, OSCMessage("/empty")):
+            bundle.append(item)
+        nested = OSCBundle()
+        nested.append(bundle)
+        nested.append(long_msg)
+        return [msg.getBinary(), long_msg.getBinary(), blobs.getBinary(), bundle.getBinary(),
+                nested.getBinary(), OSCMessage("/empty").getBinary(), encodeOSC("/b", [b"abcde"])]
+
+    def test_same_values(self):
+        """ Messages and bundles decode to the same lists from bytes or memoryviews """
+        for packet in self.get_packets():
+            expected = decodeOSC(packet)
+            self.assertEqual(decodeOSCBuffer(packet), expected)
+            self.assertEqual(decodeOSCBuffer(memoryview(packet)), expected)
+            self.assertEqual(decodeOSCBuffer(bytearray(packet)), expected)
+
+    def test_server(self):
+        """ Messages received by a BidirectionalOSCServer are decoded """
+        server = BidirectionalOSCServer(("localhost", 0))
+        server.start()
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.sendto(encodeOSC("/esp/tempo/r", [1, 120.0, 5, 100, 8]), server.server_address)
+            sock.close()
+            self.assertEqual(server.receive("/esp/tempo/r"), [1, 120.0, 5, 100, 8])
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -0,0 +1,62 @@
+""" Tests for parsing play strings """
+import unittest
+
+from FoxDot.lib.Patterns import P, Pattern, PGroupPlus, PGroupOr, PRand
+from FoxDot.lib.Patterns.Parse import ParsePlayString, PlayNode, PlayStringCache, parse_play_string, play_string_cache
+from FoxDot.lib.Patterns.PlayString import ParseError
+
+
+class TestParse(unittest.TestCase):
+
+    def setUp(self):
+        super(TestParse, self).setUp()
+        play_string_cache.clear()
+
+    def test_nodes(self):
+        nodes = parse_play_string("x(-o)[ab]")
+        self.assertEqual(nodes, (
+            PlayNode("char", "x"),
+            PlayNode("(", (PlayNode("char", "-"), PlayNode("char", "o"))),
+            PlayNode("[", (PlayNode("char", "a"), PlayNode("char", "b"))),
+        ))
+
+    def test_brackets(self):
+        self.assertEqual(list(P["x(-o)"]), ["x", "-", "x", "o"])
+        self.assertEqual(P["x[-o]"].data, ["x", PGroupPlus("-", "o")])
+        self.assertEqual(list(P["<x-><o >"]), [P("x", "o"), P("-", " ")])
+        self.assertIsInstance(P["{xo}"].data[0], PRand)
+        self.assertIsInstance(P["|x2|"].data[0], PGroupOr)
+
+    def test_deep_nesting(self):
+        string = "x(-[o(*=)]<a{bc}>)" * 3
+        data = ParsePlayString(string)
+        self.assertEqual(len(data), 6)
+        self.assertEqual(data[1][0], "-")
+        self.assertEqual(data[1][1][0], PGroupPlus("o", "*"))
+        self.assertIsInstance(data[1][2], Pattern)
+
+    def test_unmatched_closing_brackets(self):
+        self.assertEqual(ParsePlayString("x)o]"), ["x", "o"])
+
+    def test_errors(self):
+        for string in ("x(o", "x[]", "<>", "x|o", "|xo1|", "[(x]o)"):
+            with self.assertRaises(ParseError):
+                ParsePlayString(string)
+
+    def test_cache(self):
+        """ Strings are only parsed once but new pattern data is created each time """
+        a, b = ParsePlayString("x[-o]{ab}"), ParsePlayString("x[-o]{ab}")
+        self.assertEqual(len(play_string_cache), 1)
+        self.assertIsNot(a, b)
+        self.assertIsNot(a[2], b[2])
+        cache = PlayStringCache(size=2)
+        for string in ("x", "o", "-", "x"):
+            cache.get(string)
+        self.assertEqual(list(cache.data.keys()), ["-", "x"])
+        cache.set_size(0)
+        cache.get("o")
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
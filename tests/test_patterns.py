@@ -1,10 +1,154 @@
 import unittest
 
 from FoxDot.lib import Patterns
+from FoxDot.lib.Patterns import P, Pattern, PRange
+from FoxDot.lib.Patterns.Operations import POperand, Add, rSub, Div, rPow
 
 class TestPatternMethods(unittest.TestCase):
     pass
 
+class TestNumericPatterns(unittest.TestCase):
+
+    """ Test the faster paths for patterns that only contain ints and floats """
+
+    def reference(self, func, a, b):
+        """ Returns the result of an operation without the numeric path """
+        operand = POperand(func)
+        operand.fast_operate = None
+        return operand(a, b)
+
+    def test_is_numeric(self):
+        self.assertTrue(P[0, 1.5, -2].is_numeric())
+        self.assertFalse(P[0, [1, 2]].is_numeric())
+        self.assertFalse(P[0, (1, 2)].is_numeric())
+        self.assertFalse(P["x", "o"].is_numeric())
+
+    def test_operations_match(self):
+        """ Results, including their types, are the same as calculating each value separately """
+        a = PRange(12) * 0.5 + P[0, 1]
+        for func in (Add, rSub, Div, rPow):
+            for b in (P[1, 2, 0], 3, 0, P[2.5]):
+                expected = self.reference(func, a, b)
+                result = POperand(func)(a, b)
+                self.assertEqual(list(result.data), list(expected.data))
+                self.assertEqual([type(x) for x in result.data], [type(x) for x in expected.data])
+
+    def test_ints_are_kept(self):
+        self.assertEqual([type(x) for x in (P[0, 1] + 1).data], [int, int])
+
+    def test_zero_division(self):
+        self.assertEqual(list(P[1, 2] / P[1, 0]), [1, 0])
+        self.assertEqual(list(P[1, 2] % 0), [0, 0])
+
+    def test_non_numeric(self):
+        self.assertEqual(list(P[0, [1, 2]] + 1), [1, 2, 1, 3])
+        self.assertEqual(list(P[0, 1] + (1, 2)), [P(1, 2), P(2, 3)])
+
+    def test_methods(self):
+        pat = P[0, 1, 2, 3.5]
+        self.assertEqual(pat.reverse().data, [3.5, 2, 1, 0])
+        self.assertEqual(pat.mirror().data, [3.5, 2, 1, 0])
+        self.assertEqual(pat.rotate(1).data, [1, 2, 3.5, 0])
+        self.assertEqual(pat.stretch(6).data, [0, 1, 2, 3.5, 0, 1])
+        self.assertEqual(pat.stretch(3).data, [0, 1, 2])
+        self.assertEqual(pat.rotate([1, 2]).data, [1, 2, 3.5, 0, 2, 3.5, 0, 1])
+        self.assertEqual(P[0, [1, 2]].mirror().data, [P[2, 1], 0])
+
+    def test_length_after_changes(self):
+        """ The stored length is updated when the data changes """
+        pat = P[0, 1, 2]
+        self.assertEqual(len(pat), 3)
+        pat.append([3, 4])
+        self.assertEqual(len(pat), 8)
+        pat = P[0, 1, 2]
+        self.assertEqual(len(pat), 3)
+        pat[4] = 5
+        self.assertEqual(len(pat), 6)
+        pat = P[0, 1, 2]
+        self.assertEqual(len(pat), 3)
+        pat.set(0, [1, 2])
+        self.assertEqual(len(pat), 6)
+        pat = P[0, 1, 2]
+        self.assertEqual(len(pat), 3)
+        pat.data = [0, P[1, 2]]
+        self.assertEqual(len(pat), 4)
+
+class TestExpandedPatterns(unittest.TestCase):
+
+    """ Test indexing laced patterns using their stored expansion """
+
+    def setUp(self):
+        super(TestExpandedPatterns, self).setUp()
+        self.patterns = [
+            P[0, 1, [2, 3, [4, 5]]],
+            P[[0, [1, [2, [3, 4]]]], 5, [6, 7, 8]],
+            P[0, (1, 2), [3, (4, 5)], ["x", ["y", "z"]]],
+            P[[0, 1], [2, 3, 4], [5, 6, 7, 8, 9], [10, 11, 12, 13, 14, 15, 16]],
+        ]
+
+    def reference(self, pat, key):
+        """ Indexes the pattern without expanding it """
+        limit = Pattern.EXPAND_LIMIT
+        try:
+            Pattern.EXPAND_LIMIT = 0
+            pat.expanded_cache = None
+            return pat.getitem(key)
+        finally:
+            Pattern.EXPAND_LIMIT = limit
+            pat.expanded_cache = None
+
+    def test_deep_laced_values(self):
+        self.assertEqual([P[0, 1, [2, 3, [4, 5]]][i] for i in range(18)],
+                         [0, 1, 2, 0, 1, 3, 0, 1, 4, 0, 1, 2, 0, 1, 3, 0, 1, 5])
+        for pat in self.patterns:
+            size = len(pat)
+            for key in range(-size, size * 2 + 1):
+                self.assertEqual(pat[key], self.reference(pat, key))
+
+    def test_expanded_once(self):
+        pat = self.patterns[0]
+        expanded = pat.expand()
+        self.assertEqual(len(expanded), len(pat))
+        pat[0]
+        self.assertIs(pat.expand(), expanded)
+
+    def test_mutation(self):
+        """ The expansion is updated when the pattern or a nested pattern changes """
+        pat = P[0, [1, 2]]
+        self.assertEqual(list(pat), [0, 1, 0, 2])
+        pat.data[1].append(3)
+        self.assertEqual([pat[i] for i in range(6)], [0, 1, 0, 2, 0, 3])
+        pat.set(0, [4, 5])
+        self.assertEqual([pat[i] for i in range(4)], [4, 1, 5, 2])
+        pat.data = [6, 7]
+        self.assertEqual(pat[1], 7)
+        pat = P[0, [1, 2], 3]
+        self.assertEqual([pat[i] for i in range(6)], [0, 1, 3, 0, 2, 3])
+        pat.i_reverse()
+        self.assertEqual([pat[i] for i in range(6)], [3, 1, 0, 3, 2, 0])
+        pat.i_rotate()
+        self.assertEqual([pat[i] for i in range(6)], [1, 0, 3, 2, 0, 3])
+        pat = P[0, [1, 2]]
+        pat.i_shuf()
+        self.assertEqual(sorted(pat[i] for i in range(4)), [0, 0, 1, 2])
+        pat = P[3, 1, 2]
+        pat.is_numeric()
+        pat.i_sort()
+        self.assertEqual([pat[i] for i in range(3)], [1, 2, 3])
+
+    def test_limit(self):
+        """ Large laced patterns and generators are indexed without expanding them """
+        pat = P[[0, 1], [2, 3, 4], [5, 6, 7, 8, 9], [10, 11, 12, 13, 14, 15, 16]]
+        limit = Pattern.EXPAND_LIMIT
+        try:
+            Pattern.EXPAND_LIMIT = 100
+            pat.expanded_cache = None
+            self.assertIsNone(pat.expand())
+            self.assertEqual(pat[5], 3)
+        finally:
+            Pattern.EXPAND_LIMIT = limit
+        self.assertIsNone(P[0, Patterns.PRand(0, 10)].expand())
+
 if __name__ == "__main__":
 
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,271 @@
+""" Tests for Player """
+import unittest
+
+from FoxDot.lib import Player, Clock, SynthDefs, var, play
+from FoxDot.lib.Patterns import P, Pattern, PGroup, PRand
+from FoxDot.lib.Players import expand_pgroups
+
+
+def recursive_packets(event, index, packets):
+    """ Unpacks nested PGroups one level at a time, as Player.send_osc_message used to """
+    for key, value in event.items():
+        if isinstance(value, PGroup):
+            new_event = {}
+            for new_key, new_value in event.items():
+                new_event[new_key] = new_value[index] if isinstance(new_value, PGroup) else new_value
+            size = max(len(v) if isinstance(v, PGroup) else 1 for v in new_event.values())
+            for i in range(size):
+                recursive_packets(new_event, i, packets)
+            return packets
+    packets.append(dict(event))
+    return packets
+
+
+class TestLookahead(unittest.TestCase):
+
+    """ Test events rendered ahead of time by Player.lookahead """
+    def setUp(self):
+        super(TestLookahead, self).setUp()
+        self.player = Player("test")
+        self.player >> SynthDefs["pluck"]([0, 1, (2, 4)], dur=[1, 1/2], amp=[1, 0.5])
+
+    def tearDown(self):
+        super(TestLookahead, self).tearDown()
+        self.player.stop()
+
+    def test_rendered_event_matches(self):
+        """ Rendered event dicts are the same as calculated on the beat """
+        for n in range(6):
+            rendered = self.player.render_event(n, Clock.now() + n)
+            self.player.event_n = n
+            self.player.get_event()
+            self.assertEqual(rendered.event, self.player.event)
+            self.assertEqual(len(rendered.bundles), 2 if n % 3 == 2 else 1)
+
+    def test_time_varying_not_rendered(self):
+        """ Events that use a TimeVar are calculated on the beat """
+        self.player.degree = var([0, 1])
+        self.assertIsNone(self.player.render_event(0, Clock.now()))
+
+    def test_attr_added_while_rendering(self):
+        """ Events are rendered from a copy of the attributes """
+        player = self.player
+        class AddsAttr(Pattern):
+            def __getitem__(self, key):
+                player.attr["added"] = P[0]
+                return Pattern.__getitem__(self, key)
+        player.attr["pan"] = AddsAttr([0])
+        self.assertIsNotNone(player.render_event(0, Clock.now()))
+        self.assertIn("added", player.attr)
+
+    def test_setattr_invalidates(self):
+        """ Changing an attribute discards rendered events """
+        self.player.lookahead(4)
+        self.player.render_ahead(self.player.event_n, self.player.event_index)
+        self.assertEqual(len(self.player.rendered_events), 4)
+        self.player.oct = 4
+        self.assertEqual(len(self.player.rendered_events), 0)
+
+
+def linear_count(durations, now, event_after=False):
+    """ Walks through `durations` one at a time, as Player.count used to, but treating
+        times within a rounding error of the end of a duration as equal to it """
+    total_dur = float(sum(durations))
+    acc = now - (now % total_dur)
+    n = int(len(durations) * (acc / total_dur))
+    error = 1e-9 * max(1.0, abs(now))
+    if acc != now:
+        while True:
+            dur = float(durations[n % len(durations)])
+            if abs(acc + dur - now) <= error:
+                return n + 1, now
+            elif acc + dur > now:
+                return (n + 1, acc + dur) if event_after else (n, acc)
+            acc += dur
+            n += 1
+    return n, acc
+
+
+class TestCount(unittest.TestCase):
+
+    """ Test Player.count against walking through each duration """
+    def setUp(self):
+        super(TestCount, self).setUp()
+        self.player = Player("test")
+
+    def tearDown(self):
+        super(TestCount, self).tearDown()
+        self.player.stop()
+
+    def assertSameCount(self, durations, times):
+        self.player.current_dur = durations
+        for now in times:
+            for event_after in (False, True):
+                n, acc = self.player.count(now, event_after)
+                expected_n, expected_acc = linear_count(durations, now, event_after)
+                self.assertEqual(n, expected_n)
+                self.assertAlmostEqual(acc, expected_acc)
+
+    def test_count(self):
+        """ Counts on, between, and across event boundaries """
+        times = [0, 0.25, 1, 1.5, 3.75, 4, 10.125, 63.5, 1000.25]
+        self.assertSameCount([1, 0.5, 0.5, 2], times)
+        self.assertSameCount([0.25] * 64, times)
+        self.assertSameCount([0.75, 0, 0.25, 1.5], times)
+
+    def test_non_dyadic_durations(self):
+        """ Times found by adding up durations that can't be represented exactly """
+        for durations in ([1/3] * 3, [0.1] * 10, [0.2, 0.1, 0.3], [1/3, 2/3, 0.5]):
+            times, beat = [], 0
+            for i in range(120):
+                beat += durations[i % len(durations)]
+                times.append(beat)
+                times.append(beat + 0.05)
+            self.assertSameCount(durations, times)
+        self.player.current_dur = [1/3] * 3
+        self.assertEqual(self.player.count(4/3), (4, 4/3))
+        self.assertEqual(self.player.count(10/3, True), (10, 10/3))
+
+    def test_offsets_cached(self):
+        """ Cumulative durations are only re-calculated when the durations change """
+        self.player.current_dur = [1, 0.5, 0.5]
+        self.player.count(10.5)
+        offsets = self.player.dur_offsets
+        self.player.count(11.25)
+        self.assertIs(self.player.dur_offsets, offsets)
+        self.player.current_dur = [1, 1]
+        self.player.count(11.25)
+        self.assertEqual(self.player.dur_offsets[2], [0, 1.0, 2.0])
+
+    def test_offsets_kept_while_dur_unchanged(self):
+        """ `dur_updated` keeps the same durations while they don't change """
+        self.player >> SynthDefs["pluck"]([0, 1], dur=[1, 1/3, 2/3])
+        self.player.dur_updated()
+        self.player.count(10.5)
+        offsets = self.player.dur_offsets
+        self.assertFalse(self.player.dur_updated())
+        self.player.count(12)
+        self.assertIs(self.player.dur_offsets, offsets)
+        self.player.dur = [1, 1]
+        self.assertTrue(self.player.dur_updated())
+        self.player.count(12)
+        self.assertIsNot(self.player.dur_offsets, offsets)
+
+
+class TestGetEvent(unittest.TestCase):
+
+    """ Test that only attributes that aren't constant are calculated for each event """
+    def setUp(self):
+        super(TestGetEvent, self).setUp()
+        self.player = Player("test")
+        self.player >> SynthDefs["pluck"]([0, 1, (2, 4)], dur=[1, 1/2], amp=1, pan=var([-1, 1]), room=0.5, lpf=[400, 800.5, 1200])
+
+    def tearDown(self):
+        super(TestGetEvent, self).tearDown()
+        self.player.stop()
+
+    def test_attr_kinds(self):
+        """ Attributes are classified when set """
+        self.player.get_event()
+        kinds = self.player.attr_kinds[2]
+        self.assertEqual(kinds["amp"], "constant")
+        self.assertEqual(kinds["room"], "constant")
+        self.assertEqual(kinds["degree"], "pattern")
+        self.assertEqual(kinds["pan"], "timevar")
+        self.assertEqual(kinds["lpf"], "pattern")
+        self.player.amp = [1, 0.5]
+        self.player.get_event()
+        self.assertEqual(self.player.attr_kinds[2]["amp"], "pattern")
+
+    def test_same_event(self):
+        """ Events are the same as calculating every attribute """
+        for n in range(6):
+            self.player.event_n = n
+            self.player.get_event()
+            expected = dict((attr, self.player.now(attr)) for attr in self.player.attr)
+            expected = self.player.get_prime_funcs(self.player.unduplicate_durs(expected))
+            self.assertEqual(self.player.event, expected)
+            self.assertEqual(list(self.player.event), list(expected))
+
+
+class TestSampleKeys(unittest.TestCase):
+
+    """ Test keeping track of the samples used by a playing player """
+    def setUp(self):
+        super(TestSampleKeys, self).setUp()
+        self.player = Player("test")
+        self.player >> play("x-|o2|", sample=1)
+
+    def tearDown(self):
+        super(TestSampleKeys, self).tearDown()
+        self.player.stop()
+
+    def test_play_string(self):
+        """ Samples in "|x2|" are used instead of the `sample` attribute """
+        self.assertEqual(self.player.sample_keys, set([("x", 1), ("-", 1), ("o", 2)]))
+
+    def test_update(self):
+        self.player.sample = [3, 4]
+        self.assertEqual(self.player.sample_keys, set([("x", 3), ("-", 3), ("x", 4), ("-", 4), ("o", 2)]))
+        self.player.degree = "a"
+        self.assertEqual(self.player.sample_keys, set([("a", 3), ("a", 4)]))
+
+    def test_played_samples(self):
+        """ Samples chosen by generators are added when they're played """
+        self.player.sample = PRand([5, 6])
+        self.player.event_n = 0
+        self.player.get_event()
+        self.player.new_message_header(self.player.event, sample=6)
+        self.assertIn(("x", 6), self.player.sample_keys)
+        self.assertIsInstance(self.player.sample_keys, frozenset)
+
+    def test_in_use(self):
+        self.player.samples.waitForPreload()
+        buf = self.player.samples.getLoadedBuffer("o", 2)
+        self.assertIn(buf.bufnum, Player.get_buffers_in_use())
+
+
+class TestExpandPGroups(unittest.TestCase):
+
+    """ Test the iterative PGroup expander against recursive unpacking """
+    def assertSamePackets(self, event):
+        size = max(len(v) if isinstance(v, PGroup) else 1 for v in event.values())
+        for index in range(size):
+            expected = recursive_packets(event, index, [])
+            packets = [dict(packet) for packet in expand_pgroups(event, index)]
+            self.assertEqual(packets, expected)
+            self.assertEqual([list(p) for p in packets], [list(p) for p in expected])
+
+    def test_flat_event(self):
+        """ Events without PGroups give one packet """
+        self.assertSamePackets({"degree": 0, "amp": 1, "dur": 1})
+
+    def test_chord(self):
+        """ Single level PGroups are laced together """
+        self.assertSamePackets({"degree": P(0, 2, 4), "amp": P(1, 0.5), "dur": 1})
+
+    def test_nested_groups(self):
+        """ Nested PGroups in several attributes """
+        self.assertSamePackets({
+            "degree": P(0, P(2, P(4, 5)), 7),
+            "oct": P(5, P(4, 6)),
+            "pan": P(-1, 1),
+            "amp": 1,
+        })
+
+    def test_send_osc_message(self):
+        """ Player.send_osc_message pushes the same packets """
+        player = Player("test")
+        packets = []
+        object.__setattr__(player, "push_osc_to_server", lambda packet, *args, **kwargs: packets.append(dict(packet)))
+        event = {"degree": P(0, P(2, 4)), "amp": P(1, 0.5), "amplify": 0.5, "sus": 1}
+        player.send_osc_message(event, 1)
+        expected = recursive_packets(event, 1, [])
+        for packet in expected:
+            packet["amp"] = packet["amp"] * packet["amplify"]
+        self.assertEqual(packets, expected)
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -0,0 +1,74 @@
+""" Tests for Scale """
+import unittest
+
+from FoxDot.lib.Scale import Scale, Tuning, ScalePattern, FreqScalePattern, midi, miditofreq
+from FoxDot.lib.Scale import get_freq_and_midi, get_freqs_and_midis, freq_cache
+
+
+DEGREES = [0, 1, 2.5, 4, 6.75, 7, 13, -1, -3.5, -8, 20.25]
+
+
+def reference(degree, octave, root, scale):
+    """ Calculates a note without using the cache """
+    if isinstance(scale, (ScalePattern, type(Scale.default))):
+        return scale.get_freq(degree, octave, root, get_midi=True)
+    midinote = midi(scale, octave, degree, root)
+    return miditofreq(midinote), midinote
+
+
+class TestFreqAndMidi(unittest.TestCase):
+
+    """ Test cached and batch note calculation against ScalePattern.get_freq """
+    def setUp(self):
+        super(TestFreqAndMidi, self).setUp()
+        freq_cache.clear()
+        self.scales = [
+            Scale.major,
+            Scale.minor.pentatonic,
+            ScalePattern([0, 2, 4, 5, 7, 9, 11], tuning=Tuning.just),
+            ScalePattern([0, 2, 3, 5, 7, 8, 10], tuning=Tuning.bohlen_pierce),
+            [0, 3, 7],
+            Scale.default,
+        ]
+
+    def test_cached_notes_match(self):
+        """ Cached notes are the same as calculated notes, including repeats """
+        for scale in self.scales:
+            for _ in range(2):
+                for degree in DEGREES:
+                    expected = reference(degree, 5, 2, scale)
+                    self.assertEqual(get_freq_and_midi(degree, 5, 2, scale), expected)
+        self.assertTrue(len(freq_cache) > 0)
+
+    def test_batch_notes_match(self):
+        """ Batch calculation gives the same values as single notes """
+        octaves = [4, 5, 6] * 4
+        for scale in self.scales:
+            freqs, midinotes = get_freqs_and_midis(DEGREES, octaves[:len(DEGREES)], 0, scale)
+            for i, degree in enumerate(DEGREES):
+                freq, midinote = reference(degree, octaves[i], 0, scale)
+                self.assertAlmostEqual(freqs[i], freq)
+                self.assertAlmostEqual(midinotes[i], midinote)
+
+    def test_changed_default_scale(self):
+        """ Changing Scale.default gives new values """
+        original = Scale.default.name
+        try:
+            Scale.default.set("major")
+            self.assertEqual(get_freq_and_midi(2, 5, 0, Scale.default)[1], 64)
+            Scale.default.set("minor")
+            self.assertEqual(get_freq_and_midi(2, 5, 0, Scale.default)[1], 63)
+        finally:
+            Scale.default.set(original)
+
+    def test_freq_scale(self):
+        """ Frequency scales aren't tabulated """
+        scale = FreqScalePattern()
+        self.assertEqual(get_freq_and_midi(440, 5, 0, scale)[0], 440)
+        freqs, midinotes = get_freqs_and_midis([440, 220], 5, 0, scale)
+        self.assertEqual(list(freqs), [440, 220])
+        self.assertAlmostEqual(midinotes[1], 57)
+
+
+if __name__ == "__main__":
+    unittest.main()
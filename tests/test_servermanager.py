@@ -0,0 +1,348 @@
+""" Tests for ServerManager """
+import socket
+import time
+import unittest
+
+from FoxDot.lib import Server, Player, SynthDefs, var
+from FoxDot.lib.ServerManager import ServerManager, BundleTemplate, IDAllocator, OSCStreamClient, RecordingClient, OSC_TRANSPORTS
+from FoxDot.lib.OSC3 import OSCBundle, OSCMessage, decodeOSC
+
+
+class TestBundleBatching(unittest.TestCase):
+
+    """ Test combining OSC bundles into fewer datagrams """
+    def setUp(self):
+        super(TestBundleBatching, self).setUp()
+        self.server = ServerManager("localhost", 57110)
+        self.sent = []
+        self.server.sendOSC = self.sent.append
+        self.now = time.time()
+
+    def make_bundle(self, i, delay=0):
+        bundle = OSCBundle(time=self.now + delay)
+        msg = OSCMessage("/s_new")
+        msg.append(["pluck", 1000 + i, 1, 1, "freq", 440.0, "amp", 1.0])
+        bundle.append(msg)
+        msg = OSCMessage("/n_set")
+        msg.append([1000 + i, "amp", 0.5])
+        bundle.append(msg)
+        return bundle
+
+    def messages(self, bundle):
+        """ Returns the decoded messages in a bundle """
+        return decodeOSC(bundle.getBinary())[2:]
+
+    def test_single_datagram(self):
+        """ Bundles with the same timetag are combined into one flat bundle """
+        bundles = [self.make_bundle(i) for i in range(30)]
+        sizes = self.server.sendOSCBundles(bundles)
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(sizes, [len(self.sent[0].getBinary())])
+        messages = self.messages(self.sent[0])
+        self.assertEqual(messages, [msg for b in bundles for msg in self.messages(b)])
+        self.assertTrue(all(msg[0] != "#bundle" for msg in messages))
+        self.assertAlmostEqual(self.sent[0].timetag, self.now)
+
+    def test_delayed_note(self):
+        """ A bundle with a different timetag, e.g. from a note's delay, is sent separately """
+        bundles = [self.make_bundle(0), self.make_bundle(1, delay=0.25), self.make_bundle(2)]
+        self.server.sendOSCBundles(bundles)
+        self.assertEqual(len(self.sent), 2)
+        self.assertAlmostEqual(self.sent[0].timetag, self.now)
+        self.assertEqual(self.messages(self.sent[0]), self.messages(bundles[0]) + self.messages(bundles[2]))
+        self.assertIs(self.sent[1], bundles[1])
+        self.assertAlmostEqual(decodeOSC(self.sent[1].getBinary())[1], self.now + 0.25, places=3)
+
+    def test_split_at_max_size(self):
+        """ Bundles are split when a datagram would be too large """
+        self.server.max_datagram_size = 512
+        bundles = [self.make_bundle(i) for i in range(30)]
+        sizes = self.server.sendOSCBundles(bundles)
+        self.assertGreater(len(self.sent), 1)
+        self.assertTrue(all(size <= 512 for size in sizes))
+        messages = [msg for bundle in self.sent for msg in self.messages(bundle)]
+        self.assertEqual(len(messages), 60)
+
+    def test_one_bundle_not_nested(self):
+        """ A single bundle is sent as it is """
+        bundle = self.make_bundle(0)
+        self.server.sendOSCBundles([bundle])
+        self.assertIs(self.sent[0], bundle)
+
+
+class TestBundleTemplates(unittest.TestCase):
+
+    """ Test bundles encoded from cached templates """
+    def setUp(self):
+        super(TestBundleTemplates, self).setUp()
+        self.use_templates = Server.use_bundle_templates
+
+    def tearDown(self):
+        super(TestBundleTemplates, self).tearDown()
+        Server.use_bundle_templates = self.use_templates
+
+    def compile_both(self, messages):
+        Server.use_bundle_templates = False
+        expected = Server.compile_bundle(messages, 100.5)
+        Server.use_bundle_templates = True
+        return expected, Server.compile_bundle(messages, 100.5)
+
+    def test_same_binary(self):
+        """ Template bundles have the same binary as OSCMessage bundles """
+        for values in ((1001, 4, 0.5, 440.0), (1002, 6, 0.25, 220.5)):
+            node, bus, sus, freq = values
+            messages = [("/g_new", [node, 1, 1]),
+                        ("/s_new", ["pluck", node + 1, 1, node, "bus", bus, "sus", sus, "freq", freq]),
+                        ("/s_new", ["makeSound", node + 2, 1, node, "bus", bus, "sus", sus])]
+            expected, bundle = self.compile_both(messages)
+            self.assertEqual(bundle.getBinary(), expected.getBinary())
+            self.assertEqual(bundle.values(), expected.values())
+
+    def test_unsupported_types(self):
+        """ Templates are only made for str, int and float arguments """
+        self.assertTrue(BundleTemplate.supports((("/s_new", ("pluck", int, float)),)))
+        self.assertFalse(BundleTemplate.supports((("/s_new", ("pluck", int, bool)),)))
+
+
+class TestIDAllocator(unittest.TestCase):
+
+    """ Test re-using node and bus IDs """
+    def test_reuse(self):
+        """ Released IDs are re-used, oldest first """
+        ids = IDAllocator(4, 10, 2)
+        self.assertEqual([ids.alloc() for _ in range(4)], [4, 6, 8, None])
+        ids.release(6)
+        ids.release(4)
+        self.assertEqual([ids.alloc(), ids.alloc()], [6, 4])
+        self.assertEqual((ids.in_use, ids.peak), (3, 3))
+
+    def test_shared(self):
+        """ Shared IDs are only re-used once every user has released them """
+        ids = IDAllocator(4, 8, 2)
+        self.assertEqual([ids.alloc(), ids.alloc(), ids.share(4)], [4, 6, 4])
+        self.assertEqual(ids.in_use, 3)
+        ids.release(4)
+        self.assertIsNone(ids.alloc())
+        ids.release(4)
+        self.assertEqual((ids.alloc(), ids.in_use), (4, 2))
+
+    def test_busses_full(self):
+        """ Busses taken when none are due to be released are still released once """
+        bus_ids, expiring, overflows = Server.bus_ids, Server.expiring_busses, Server.bus_overflows
+        try:
+            Server.bus_ids = IDAllocator(4, 8, 2)
+            Server.expiring_busses = []
+            busses = [Server.nextbusID() for _ in range(3)]
+            self.assertEqual(busses, [4, 6, 4])
+            for bus in busses:
+                Server.release_ids_at(0, [], bus)
+            Server.release_ids(1)
+            self.assertEqual(Server.bus_ids.in_use, 0)
+            self.assertEqual(sorted(Server.bus_ids.free), [4, 6])
+        finally:
+            Server.bus_ids, Server.expiring_busses, Server.bus_overflows = bus_ids, expiring, overflows
+
+    def test_note_ids_released(self):
+        """ Notes' nodes and busses are released when they have ended """
+        player = Player("test")
+        player >> SynthDefs["pluck"](0, room=0.5)
+        player.get_event()
+        packet = player.new_message_header(dict(player.event))
+        player.stop()
+        Server.release_ids(float("inf"))
+        before = Server.get_id_stats()
+        now = time.time() + 1000
+        bundles = [Server.get_bundle("pluck", dict(packet), timestamp=now) for _ in range(3)]
+        stats = Server.get_id_stats()
+        self.assertEqual(stats["busses"], before["busses"] + 3)
+        self.assertEqual(stats["nodes"], before["nodes"] + 3 * len(decodeOSC(bundles[0].getBinary())[2:]))
+        end = now + float(packet["sus"]) * 8 + 0.1
+        Server.release_ids(end - 0.01)
+        self.assertEqual(Server.get_id_stats()["busses"], before["busses"] + 3)
+        Server.release_ids(end)
+        stats = Server.get_id_stats()
+        self.assertEqual((stats["nodes"], stats["busses"]), (before["nodes"], before["busses"]))
+
+
+class FakeQueueBlock(object):
+
+    """ Collects the bundles a Player sends on the beat """
+    def __init__(self):
+        self.osc_messages = []
+
+    def append_osc_message(self, message):
+        self.osc_messages.append(message)
+
+
+class TestSharedEffects(unittest.TestCase):
+
+    def get_packet(self, **kwargs):
+        """ Returns the message for the first note of a player with `kwargs` """
+        player = Player("test")
+        player >> SynthDefs["pluck"](0, dur=1/8, **kwargs)
+        player.get_event()
+        packet = player.new_message_header(dict(player.event))
+        player.stop()
+        return packet
+
+    def test_fewer_nodes(self):
+        """ Notes using a shared effect group don't create their own effect nodes """
+        packet = self.get_packet(hpf=200, lpf=4000, room=0.5, echo=0.25, formant=2)
+        Server.release_ids(float("inf"))
+        before = Server.get_id_stats()["nodes"]
+        now = time.time() + 1000
+        Server.get_bundle("pluck", dict(packet), timestamp=now)
+        per_note = Server.get_id_stats()["nodes"] - before
+        for _ in range(3):
+            Server.get_bundle("pluck", dict(packet), timestamp=now, shared_fx="shared")
+        group_nodes = 1 + 5 + 1
+        shared_notes = Server.get_id_stats()["nodes"] - before - per_note - group_nodes
+        self.assertEqual(shared_notes, 3 * (per_note - 5))
+        Server.free_shared_fx("shared")
+        Server.release_ids(float("inf"))
+        self.assertEqual(Server.get_id_stats()["nodes"], before)
+
+    def test_changed_args(self):
+        """ Changed effect arguments update the shared group, and changed effects replace it """
+        Server.get_bundle("pluck", self.get_packet(room=0.5), shared_fx="shared")
+        group = Server.shared_fx["shared"].group
+        bundle = Server.get_bundle("pluck", self.get_packet(room=0.8), shared_fx="shared")
+        addresses = [msg[0] for msg in decodeOSC(bundle.getBinary())[2:]]
+        self.assertEqual(addresses[0], "/n_set")
+        self.assertEqual(Server.shared_fx["shared"].group, group)
+        Server.get_bundle("pluck", self.get_packet(room=0.8, lpf=400), shared_fx="shared")
+        self.assertNotEqual(Server.shared_fx["shared"].group, group)
+        Server.get_bundle("pluck", self.get_packet(), shared_fx="shared")
+        self.assertNotIn("shared", Server.shared_fx)
+
+    def play_beat(self, player, timestamp):
+        """ Sends the player's current event as `Player.__call__` does """
+        rendered = player.get_rendered_event()
+        if rendered is None:
+            player.get_event()
+            player.send(timestamp=timestamp)
+        else:
+            player.event = rendered.event
+            player.queue_block.osc_messages.extend(rendered.bundles)
+        player.event_index += player.get_event_dur(player.event)
+        player.event_n += 1
+        player.render_ahead(player.event_n, player.event_index)
+
+    def test_lookahead(self):
+        """ Shared groups are only created or changed by bundles sent on the beat """
+        player = Player("test_lookahead")
+        player.share_effects()
+        player >> SynthDefs["pluck"]([0, 1], dur=1, room=0.5)
+        player.lookahead(4)
+        player.queue_block = FakeQueueBlock()
+        timestamp = time.time() + 1000
+        player.render_ahead(player.event_n, player.event_index)
+        self.assertEqual(len(player.rendered_events), 0)
+        self.assertNotIn("test_lookahead", Server.shared_fx)
+        for i in range(3):
+            self.play_beat(player, timestamp + i)
+        self.assertEqual(len(player.rendered_events), 4)
+        player.room = 0.8
+        for i in range(3, 6):
+            self.play_beat(player, timestamp + i)
+        shared = Server.shared_fx["test_lookahead"]
+        messages = [msg for b in player.queue_block.osc_messages for msg in decodeOSC(b.getBinary())[2:]]
+        self.assertIn(["/g_new", ",iii", shared.group, 1, 1], messages)
+        updates = [msg for msg in messages if msg[0] == "/n_set"]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0][2:4], [shared.nodes["room"], "room"])
+        self.assertAlmostEqual(updates[0][4], 0.8, places=6)
+        self.assertEqual(shared.args["room"][1], 0.8)
+        self.assertEqual(len([msg for msg in messages if msg[0] == "/g_new" and msg[3:5] == [2, shared.group]]), 6)
+        player.stop()
+
+    def test_player_key(self):
+        """ Players only use a shared effect group if effect attributes are constant or TimeVars """
+        player = Player("test_shared")
+        player.share_effects()
+        player >> SynthDefs["pluck"]([0, 1], room=0.5)
+        self.assertEqual(player.get_shared_fx_key(), "test_shared")
+        player >> SynthDefs["pluck"]([0, 1], room=var([0, 0.5]))
+        self.assertEqual(player.get_shared_fx_key(), "test_shared")
+        player >> SynthDefs["pluck"]([0, 1], room=[0, 0.5])
+        self.assertIsNone(player.get_shared_fx_key())
+        player.stop()
+
+
+class TestTransports(unittest.TestCase):
+
+    """ Test sending messages with other transports """
+    def setUp(self):
+        super(TestTransports, self).setUp()
+        self.transport = Server.transport
+
+    def tearDown(self):
+        Server.setTransport(self.transport)
+        super(TestTransports, self).tearDown()
+
+    def test_recording(self):
+        """ The null transport decodes and counts what the server sends """
+        client = Server.setTransport("null")
+        self.assertIsInstance(client, RecordingClient)
+        bundles = []
+        timestamp = time.time() + 10
+        player = Player("test")
+        player >> SynthDefs["pluck"]([(0, 2), 4], room=0.5)
+        for i in range(3):
+            player.event_n = i
+            player.get_event()
+            for j in range(player.get_event_length()):
+                player.send_osc_message(player.event, j, timestamp=timestamp, bundles=bundles)
+        player.stop()
+        Server.sendOSCBundles(bundles)
+        stats = client.get_stats()
+        self.assertEqual(stats["datagrams"], 1)
+        self.assertEqual(stats["bundles"], 1)
+        self.assertEqual(client.messages["/g_new"], len(bundles))
+        self.assertEqual(len(bundles), 5)
+        self.assertEqual(client.packets[-1][2:], [msg for b in bundles for msg in decodeOSC(b.getBinary())[2:]])
+
+    def test_slip_framing(self):
+        """ Framed packets containing the SLIP special bytes are unframed unchanged """
+        client = OSCStreamClient("slip")
+        packets = [b"/a\x00\x00,b\xc0\xdb", b"\xdb\xdc\xc0\xc0", b"/b"]
+        data = b"".join(client.frame(packet) for packet in packets)
+        self.assertEqual(OSCStreamClient.unframe(data), packets)
+
+    def test_tcp_framing(self):
+        """ TCP packets are prefixed with their size unless SLIP is chosen """
+        self.assertEqual(OSCStreamClient().framing, "size")
+        self.assertEqual(OSC_TRANSPORTS["tcp"]().framing, "size")
+        self.assertEqual(OSC_TRANSPORTS["tcp-slip"]().framing, "slip")
+        self.assertEqual(OSCStreamClient().frame(b"/a\x00\x00"), b"\x00\x00\x00\x04/a\x00\x00")
+
+    def test_tcp(self):
+        """ Messages are sent over TCP """
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("localhost", 0))
+        listener.listen(1)
+        for framing in ("slip", "size"):
+            client = OSCStreamClient(framing)
+            client.connect(listener.getsockname())
+            conn, _ = listener.accept()
+            msg = OSCMessage("/status")
+            msg.append([1, 0.5, "test"])
+            client.send(msg)
+            client.close()
+            data = b""
+            while True:
+                chunk = conn.recv(1024)
+                if not chunk:
+                    break
+                data += chunk
+            conn.close()
+            if framing == "slip":
+                self.assertEqual(OSCStreamClient.unframe(data), [msg.getBinary()])
+            else:
+                self.assertEqual(data[4:], msg.getBinary())
+        listener.close()
+
+
+if __name__ == "__main__":
+
+    unittest.main()
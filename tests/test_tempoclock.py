@@ -0,0 +1,112 @@
+""" Tests for TempoClock """
+import sys
+import threading
+import unittest
+
+from FoxDot.lib.TempoClock import TempoClock, Queue, BlockExecutor
+
+
+def event():
+    return
+
+
+class TestQueue(unittest.TestCase):
+
+    """ Test scheduling order of the clock queue """
+    def setUp(self):
+        super(TestQueue, self).setUp()
+        self.queue = Queue(TempoClock())
+
+    def test_empty(self):
+        """ Empty queue has no next event """
+        self.assertEqual(self.queue.next(), sys.maxsize)
+        self.assertTrue(self.queue.before_next_event(0))
+        self.assertFalse(self.queue.after_next_event(0))
+        self.assertEqual(self.queue.pop(), [])
+
+    def test_pop_in_beat_order(self):
+        """ Blocks are popped earliest beat first """
+        for beat in (4, 1, 3, 0.5, 2):
+            self.queue.add(event, beat)
+        beats = [self.queue.pop().beat for i in range(5)]
+        self.assertEqual(beats, [0.5, 1, 2, 3, 4])
+
+    def test_same_beat_merged(self):
+        """ Events at the same beat share a block """
+        self.queue.add(event, 2)
+        self.queue.add(lambda: None, 2.0)
+        self.queue.add(event, 1)
+        self.assertEqual(len(self.queue), 2)
+        self.queue.pop()
+        self.assertEqual(len(self.queue.pop()), 2)
+
+    def test_next_event(self):
+        """ Next and before/after checks use the earliest block """
+        self.queue.add(event, 8)
+        self.queue.add(event, 4)
+        self.assertEqual(self.queue.next(), 4)
+        self.assertTrue(self.queue.before_next_event(3.5))
+        self.assertTrue(self.queue.after_next_event(4))
+
+    def test_readd_after_pop(self):
+        """ Scheduling at a popped beat creates a new block """
+        self.queue.add(event, 1)
+        first = self.queue.pop()
+        self.queue.add(event, 1)
+        self.assertIsNot(self.queue.pop(), first)
+
+    def test_clear(self):
+        """ Clearing removes all blocks """
+        self.queue.add(event, 1)
+        self.queue.add(event, 2)
+        self.queue.clear()
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.next(), sys.maxsize)
+
+
+class TestWakeOnDeadline(unittest.TestCase):
+
+    """ Test the clock loop that sleeps until the next block is due """
+    def setUp(self):
+        super(TestWakeOnDeadline, self).setUp()
+        self.clock = TempoClock(bpm=120)
+        self.clock.set_wake_on_deadline(True)
+        self.clock.start()
+
+    def tearDown(self):
+        super(TestWakeOnDeadline, self).tearDown()
+        self.clock.ticking = False
+        self.clock.queue.notify()
+
+    def test_earlier_block_wakes_clock(self):
+        """ A block added before the current deadline is run on time """
+        done = threading.Event()
+        self.clock.schedule(event, self.clock.now() + 8)
+        self.clock.schedule(done.set, self.clock.now() + 0.1)
+        self.assertTrue(done.wait(1))
+        self.assertEqual(len(self.clock.queue), 1)
+
+
+class TestBlockExecutor(unittest.TestCase):
+
+    """ Test the persistent worker threads used to run queue blocks """
+    def test_single_worker(self):
+        """ Jobs run in order on one reused thread """
+        done = threading.Event()
+        calls = []
+        def job(n):
+            calls.append((n, threading.current_thread()))
+            if n == 9:
+                done.set()
+        executor = BlockExecutor(job)
+        for n in range(10):
+            executor.submit(n)
+        self.assertTrue(done.wait(5))
+        self.assertEqual([n for n, thread in calls], list(range(10)))
+        self.assertEqual(len(set(thread for n, thread in calls)), 1)
+        executor.resize(0)
+
+
+if __name__ == "__main__":
+
+    unittest.main()
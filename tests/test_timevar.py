@@ -0,0 +1,67 @@
+""" Tests for TimeVar """
+import unittest
+
+from FoxDot.lib import var, linvar
+from FoxDot.lib.Constants import inf
+from FoxDot.lib.Patterns import P, PRand
+from FoxDot.lib.TimeVar import get_cumulative_durs
+
+
+def stepped(values, durs, time):
+    """ Returns the value at `time` by adding up durations from the start """
+    i, end = 0, durs[0]
+    while end <= time:
+        i += 1
+        end += durs[i % len(durs)]
+    return values[i % len(values)]
+
+
+class TestSeek(unittest.TestCase):
+
+    """ Test finding the current value from a table of cumulative durations """
+    def test_table(self):
+        self.assertEqual(get_cumulative_durs(P[1, 2, 3]), [0, 1, 3, 6])
+        self.assertEqual(get_cumulative_durs(P[1, 2, 3], 4), [0, 2, 5, 6])
+        self.assertEqual(get_cumulative_durs(P[1, [2, 4]]), [0, 1, 3, 4, 8])
+        self.assertEqual(get_cumulative_durs(P[2, inf, 1]), [0, 2, inf])
+        self.assertIsNone(get_cumulative_durs(P[0, 0]))
+        self.assertIsNone(get_cumulative_durs(P[1, PRand([1, 2])]))
+
+    def test_forwards_and_backwards(self):
+        values, durs = [0, 1, 2, 3], [1, 2, 0.5]
+        v = var(values, durs)
+        times = [0, 0.5, 1, 2.9, 3, 3.4, 50.25, 7, 0.25, 1000.5, 3.5, 12]
+        for time in times:
+            self.assertEqual(v.now(time), stepped(values, durs, time))
+
+    def test_linvar(self):
+        v = linvar([0, 4], 4)
+        self.assertAlmostEqual(v.now(1), 1)
+        self.assertAlmostEqual(v.now(101), 3)
+        self.assertAlmostEqual(v.now(2), 2)
+
+    def test_update(self):
+        """ New durations start at the end of the current value """
+        v = var([0, 1], 4)
+        self.assertEqual(v.now(5), 1)
+        v.update([0, 1], 2)
+        self.assertEqual(v.now(6), 1)
+        self.assertEqual(v.now(8), 0)
+        self.assertEqual(v.now(10), 1)
+        self.assertEqual(v.now(12), 0)
+
+    def test_inf(self):
+        v = var([0, 1, 2], [2, inf])
+        self.assertEqual(v.now(1), 0)
+        self.assertEqual(v.now(100), 1)
+        self.assertEqual(v.now(1), 0)
+
+    def test_random_durations(self):
+        """ Durations that can change are still stepped through """
+        v = var([0, 1], PRand([1, 2]))
+        self.assertIsNone(v.get_dur_table())
+        self.assertIn(v.now(10), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()